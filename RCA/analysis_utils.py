@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def clean_value(val):
@@ -93,4 +94,118 @@ def collect_rule_features(rule, out=None):
             collect_rule_features(v, out)
         elif isinstance(v, dict) and k not in {"feature", "Prediction", "root_cause", "OK", "NG"}:
             collect_rule_features(v, out)
-    return out
\ No newline at end of file
+    return out
+
+def station_required_columns(station_rules):
+    """Union of rule features over every model of a station (empty when the station has no rules)."""
+    out = set()
+    if not isinstance(station_rules, dict):
+        return out
+    for model in station_rules.get("models", {}).values():
+        if isinstance(model, dict):
+            collect_rule_features(model.get("rules"), out)
+    return out
+
+
+def encode_features(df, features):
+    """{feature: (codes, values)} of the feature columns present in df, computed once per station.
+
+    codes gives each row the index of its value in values (-1 when missing); values are the
+    stripped strings analyze_row_with_path compares. Each distinct value is read from the row
+    iterrows() would yield for it, so numbers print the same (an int column of an all-numeric
+    frame reads as a float there).
+    """
+    factorized = {}
+    for feature in features:
+        if feature not in df.columns or not isinstance(df.columns.get_loc(feature), int):
+            continue
+        s = df[feature]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.cat.codes.to_numpy().copy()
+        else:
+            # 1 and 1.0 hash alike but print differently, so object columns are told apart by their text
+            codes, uniques = pd.factorize(s.astype(str) if s.dtype == object else s)
+            codes = codes.astype(np.min_scalar_type(-len(uniques) - 1))
+            codes[s.isna().to_numpy()] = -1
+        first = np.flatnonzero(~pd.Series(codes).duplicated().to_numpy() & (codes >= 0))
+        factorized[feature] = (codes, first)
+    if not factorized:
+        return {}
+    # one representative row per distinct value, interleaved as in iterrows(); other categorical
+    # columns are swapped for empty ones, which interleave the same without converting their categories
+    sample = df.iloc[np.concatenate([first for _, first in factorized.values()])]
+    positions = {df.columns.get_loc(feature) for feature in factorized}
+    columns = {}
+    for j in range(sample.shape[1]):
+        col = sample.iloc[:, j]
+        if j not in positions and isinstance(col.dtype, pd.CategoricalDtype):
+            col = pd.Series(pd.Categorical.from_codes(np.full(len(sample), -1), categories=[]), index=sample.index)
+        columns[j] = col
+    rows = pd.DataFrame(columns).values
+    encoded = {}
+    offset = 0
+    for feature, (codes, first) in factorized.items():
+        col = df.columns.get_loc(feature)
+        values = [None] * (int(codes.max()) + 1 if len(first) else 0)
+        for i, code in enumerate(codes[first]):
+            val = rows[offset + i, col]
+            if pd.isna(val):
+                codes[codes == code] = -1
+            else:
+                values[code] = str(clean_value(val))
+        offset += len(first)
+        encoded[feature] = (codes, values)
+    return encoded
+
+def evaluate_rule(encoded, n_rows, rule):
+    """analyze_row_with_path of every row at once, from encode_features() output.
+
+    The tree is walked once per distinct path instead of once per row: each node splits its rows
+    by the value code of its feature. Returns (predictions, root causes, paths) as object arrays.
+    """
+    preds = np.empty(n_rows, dtype=object)
+    causes = np.empty(n_rows, dtype=object)
+    paths = np.empty(n_rows, dtype=object)
+    stack = [(rule, np.arange(n_rows, dtype=np.min_scalar_type(n_rows)), None, [])]
+    while stack:
+        node, rows, parent_feature, path = stack.pop()
+        if not len(rows):
+            continue
+        feature = node.get("feature") if isinstance(node, dict) else None
+        if feature is None or "Prediction" in node:
+            # leaves never read the row
+            preds[rows], causes[rows], paths[rows] = analyze_row_with_path({}, node, parent_feature, path)
+            continue
+        if feature not in encoded:
+            preds[rows], causes[rows], paths[rows] = ("Missing", f"Missing feature: {feature}",
+                                                      "->".join(path + [f"{feature}=<MISSING>"]))
+            continue
+        codes, values = encoded[feature]
+        sub = codes[rows]
+        order = np.argsort(sub, kind="stable")
+        sub, rows = sub[order], rows[order]
+        bounds = np.flatnonzero(np.diff(sub)) + 1
+        # copies, not views: the stack then holds disjoint row sets instead of every level's sorted rows
+        groups = [rows] if not len(bounds) else [group.copy() for group in np.split(rows, bounds)]
+        codes_of = sub[np.r_[0, bounds]]
+        rows = sub = order = None
+        for group, code in zip(groups, codes_of):
+            if code < 0:
+                preds[group], causes[group], paths[group] = ("Missing", f"Missing feature: {feature}",
+                                                             "->".join(path + [f"{feature}=<MISSING>"]))
+                continue
+            val = values[code]
+            matched_key, child = _get_branch_by_exact_key(node, val)
+            if matched_key is not None:
+                stack.append((child, group, feature, path + [f"{feature}={matched_key}"]))
+            elif "fail" in node and _falsy_str(val):
+                stack.append((node["fail"], group, feature, path + [f"{feature}=FAIL-LIKE({val})"]))
+            elif "Disable" in node and _normalize_str(val) in {"DISABLE", "OFF", "-1"}:
+                stack.append((node["Disable"], group, feature, path + [f"{feature}=DISABLE({val})"]))
+            elif "pass" in node:
+                stack.append((node["pass"], group, feature, path + [f"{feature}=PASS-LIKE({val})"]))
+            else:
+                preds[group], causes[group], paths[group] = (
+                    "Unknown", parent_feature or "No Matching Rule",
+                    "->".join(path + [f"{feature}=<{val}> (no-branch)"]))
+    return preds, causes, paths
@@ -4,8 +4,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QDate, Qt
 import json
-from app_state import log
-from sqlalchemy import create_engine, inspect
+from app_state import AppState, log
 
 class AppConfigTab(QWidget):
     def __init__(self, parent=None):
@@ -106,12 +105,55 @@ class AppConfigTab(QWidget):
         self.auto_run_chk.setToolTip('If checked, the app will load config and run analysis automatically on startup')
         gbl.addWidget(self.auto_run_chk, 10, 0, 1, 3)
 
+        # Memory budget per retrieval -- tables estimated above it are streamed in chunks
+        gbl.addWidget(QLabel('Memory Budget (MB)'), 11, 0)
+        self.memory_budget = QSpinBox()
+        self.memory_budget.setMinimum(0)
+        self.memory_budget.setMaximum(1024 * 1024)
+        self.memory_budget.setSingleStep(256)
+        self.memory_budget.setSpecialValueText('Auto (half of free RAM)')
+        self.memory_budget.setToolTip('Tables estimated above this size are streamed in chunks of their rule and report columns only. 0 = automatic')
+        gbl.addWidget(self.memory_budget, 11, 1)
+
+        # Unit serial column shared by all stations, used for the cross-station lineage KPIs
+        gbl.addWidget(QLabel('Unit Serial Column'), 12, 0)
+        self.serial_column = QLineEdit()
+        self.serial_column.setPlaceholderText('Auto-detect (Serial, SN, Barcode, ...)')
+        self.serial_column.setToolTip('Column holding the unit serial number in every station table')
+        gbl.addWidget(self.serial_column, 12, 1)
+
+        # Persist analyzed rows to the local Parquet result store for history lookups
+        self.result_store_chk = QCheckBox('Keep analysis results in local result store')
+        self.result_store_chk.setChecked(True)
+        self.result_store_chk.setToolTip('Store analyzed rows by station and day to query unit history and root causes later')
+        gbl.addWidget(self.result_store_chk, 13, 0, 1, 3)
+        self.result_store_dir = ''
+        self.report_workers = 0
+        self.chart_cache_dir = ''
+        self.chart_cache_mb = 200
+        self.backfill_workers = 2
+        self.backfill_max_windows = 0
+        self.targets = []
+        self.target_workers = 0
+        self.checkpoints = True
+        self.checkpoint_dir = ''
+        self.job_queue = ''
+        self.job_lease_seconds = 600
+
+        # Report chart mode -- PNG through Matplotlib, or inline SVG drawn without it (smaller, faster)
+        gbl.addWidget(QLabel('Report Charts'), 14, 0)
+        self.chart_mode_combo = QComboBox()
+        self.chart_mode_combo.addItem('PNG images (Matplotlib)', 'png')
+        self.chart_mode_combo.addItem('Inline SVG (smaller, faster)', 'svg')
+        self.chart_mode_combo.setToolTip('How charts are embedded in the HTML report')
+        gbl.addWidget(self.chart_mode_combo, 14, 1)
+
         # Save config setting button
         self.save_btn = QPushButton('Save Configuration')
         self.save_btn.setMinimumHeight(40)
         self.save_btn.setSizePolicy(QSizePolicy.MinimumExpanding, QSizePolicy.Fixed)
         self.save_btn.clicked.connect(self.save_config)
-        gbl.addWidget(self.save_btn, 11, 0, 1, 3)
+        gbl.addWidget(self.save_btn, 15, 0, 1, 3)
 
         gbl.setColumnStretch(1, 1)
         gbl.setColumnStretch(2, 0)
@@ -146,17 +188,41 @@ class AppConfigTab(QWidget):
             self.state_combo.setCurrentText(state)
             apply_state = config.get("apply_state", True)
             self.apply_state_chk.setChecked(apply_state)
+            self.memory_budget.setValue(config.get("memory_budget_mb", 0))
+            self.serial_column.setText(config.get("serial_column", ""))
+            self.result_store_chk.setChecked(config.get("result_store", True))
+            self.result_store_dir = config.get("result_store_dir", "")
+            self.report_workers = config.get("report_workers", 0)
+            self.chart_cache_dir = config.get("chart_cache_dir", "")
+            self.chart_cache_mb = config.get("chart_cache_mb", 200)
+            self.backfill_workers = config.get("backfill_workers", 2)
+            self.backfill_max_windows = config.get("backfill_max_windows", 0)
+            self.targets = config.get("targets", [])
+            self.target_workers = config.get("target_workers", 0)
+            self.checkpoints = config.get("checkpoints", True)
+            self.checkpoint_dir = config.get("checkpoint_dir", "")
+            self.job_queue = config.get("job_queue", "")
+            self.job_lease_seconds = config.get("job_lease_seconds", 600)
+            self.set_report_chart_mode(config.get("report_chart_mode", "png"))
         except FileNotFoundError:
             pass
         except Exception as e:
             log(f"Failed to load config: {e}", "ERROR")
 
+    def report_chart_mode(self):
+        return self.chart_mode_combo.currentData()
+
+    def set_report_chart_mode(self, mode):
+        index = self.chart_mode_combo.findData(mode)
+        self.chart_mode_combo.setCurrentIndex(index if index >= 0 else 0)
+
     def browse_auto_save_folder(self):
         dir_ = QFileDialog.getExistingDirectory(self, "Select Folder")
         if dir_:
             self.auto_save_path.setText(dir_)
 
     def fetch_tables(self):
+        from sqlalchemy import create_engine, inspect
         host = self.host.text().strip()
         port = self.port.text().strip() or '3306'
         user = self.user.text().strip()
@@ -240,10 +306,27 @@ class AppConfigTab(QWidget):
             "selected_tables": self.selected_tables,
             "state": self.state_combo.currentText(),
             "apply_state": self.apply_state_chk.isChecked(),
+            "memory_budget_mb": self.memory_budget.value(),
+            "serial_column": self.serial_column.text().strip(),
+            "result_store": self.result_store_chk.isChecked(),
+            "result_store_dir": self.result_store_dir,
+            "report_workers": self.report_workers,
+            "chart_cache_dir": self.chart_cache_dir,
+            "chart_cache_mb": self.chart_cache_mb,
+            "backfill_workers": self.backfill_workers,
+            "backfill_max_windows": self.backfill_max_windows,
+            "targets": self.targets,
+            "target_workers": self.target_workers,
+            "checkpoints": self.checkpoints,
+            "checkpoint_dir": self.checkpoint_dir,
+            "job_queue": self.job_queue,
+            "job_lease_seconds": self.job_lease_seconds,
+            "report_chart_mode": self.report_chart_mode(),
         }
         try:
             with open("JSON_Files/app_config.json", "w") as f:
                 json.dump(config, f, indent=4)
+            AppState.serial_column = config["serial_column"]
             log("Configuration saved")
             QMessageBox.information(self, "Saved", "Configuration saved successfully.")
         except Exception as e:
@@ -1,28 +1,125 @@
 from datetime import datetime
-from PyQt5.QtCore import pyqtSignal, QObject
+from collections import deque
+from collections.abc import Mapping
 
-class LogSignal(QObject):
-    log_updated = pyqtSignal()
+# Log lines kept in memory and shown in the log views; older lines are dropped
+LOG_CAPACITY = 20000
+
+_log_signal = None
+
+def install_log_signal():
+    """Qt object whose log_updated(str) signal carries every new log entry.
+
+    Created on first use by the GUI, so app_state (and the headless pipeline) never import PyQt.
+    """
+    global _log_signal
+    if _log_signal is None:
+        from PyQt5.QtCore import pyqtSignal, QObject
+
+        class LogSignal(QObject):
+            # carries the new entry so views append it instead of re-reading the whole log
+            log_updated = pyqtSignal(str)
+
+        _log_signal = LogSignal()
+    return _log_signal
+
+class _LogSignalAttribute:
+    def __get__(self, obj, owner):
+        return install_log_signal()
+
+def overall_window(metas):
+    """Earliest start and latest end of the window_meta dicts of several tables."""
+    starts = [m["start"] for m in metas.values() if m and m.get("start") is not None]
+    ends = [m["end"] for m in metas.values() if m and m.get("end") is not None]
+    return (min(starts) if starts else None, max(ends) if ends else None)
+
+def join_results(df, result):
+    """Retrieved station frame with its Prediction/Root_Cause/Match_Path columns joined on."""
+    if df is None:
+        return result.copy()
+    return df.drop(columns=result.columns, errors="ignore").join(result)
+
+class AnalyzedFrames(Mapping):
+    """Read-only view joining each station's retrieved frame with its analysis results on access."""
+    def __getitem__(self, station):
+        return join_results(AppState.retrieved_dfs.get(station), AppState.analysis_results[station])
+
+    def __iter__(self):
+        return iter(AppState.analysis_results)
+
+    def __len__(self):
+        return len(AppState.analysis_results)
 
 class AppState:
     engine = None
     selected_database = None
     selected_tables = []
     retrieved_dfs = {}
-    analyzed_dfs = {}
+    table_meta = {}
+    result_cache = {}
+    serial_column = ""
+    lineage = None
+    analysis_results = {}
+    analyzed_dfs = AnalyzedFrames()
     rules = {}
     troubleshooting = {}
-    logs = []
-    log_signal = LogSignal()
+    logs = deque(maxlen=LOG_CAPACITY)
+    log_signal = _LogSignalAttribute()
     state = None
 
     @classmethod
     def append_log(cls, text):
         cls.logs.append(text)
-        cls.log_signal.log_updated.emit()
+        if _log_signal is not None:
+            _log_signal.log_updated.emit(text)
+
+    @classmethod
+    def set_retrieved(cls, dfs, meta=None):
+        from data_utils import window_meta
+        from lineage import build_lineage_index
+        # Date_Time is already parsed at ingest, so the window metadata is computed once here
+        meta = meta or {}
+        cls.retrieved_dfs = dfs
+        cls.table_meta = {name: meta.get(name) or window_meta(df) for name, df in dfs.items()}
+        cls.result_cache = {}
+        # results index into the previous frames, they cannot be joined to new ones
+        cls.analysis_results = {}
+        try:
+            cls.lineage = build_lineage_index(dfs, cls.result_series, cls.serial_column)
+        except Exception as e:
+            cls.lineage = None
+            log(f"Failed to build unit lineage index: {e}", "WARN")
+
+    @classmethod
+    def set_analysis_results(cls, results):
+        # Prediction/Root_Cause/Match_Path frames sharing the index of retrieved_dfs
+        cls.analysis_results = results
+
+    @classmethod
+    def _station_result(cls, station):
+        # Normalized Result + counts per station, rebuilt only after set_retrieved()
+        cached = cls.result_cache.get(station)
+        if cached is None:
+            from data_utils import normalize_result, result_counts
+            result = normalize_result(cls.retrieved_dfs.get(station))
+            cached = (result, result_counts(result))
+            cls.result_cache[station] = cached
+        return cached
+
+    @classmethod
+    def result_series(cls, station):
+        return cls._station_result(station)[0]
+
+    @classmethod
+    def result_counts(cls, station):
+        return cls._station_result(station)[1]
+
+    @classmethod
+    def overall_window(cls):
+        return overall_window(cls.table_meta)
 
 def log(msg, level='INFO'):
     ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     entry = f"[{ts}] {level}: {msg}"
     print(entry)
-    AppState.append_log(entry)
\ No newline at end of file
+    AppState.append_log(entry)
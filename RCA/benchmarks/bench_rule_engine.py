@@ -0,0 +1,113 @@
+"""Rule engine throughput: rows/sec and peak memory of analyze_row_with_path and other evaluators on synthetic stations.
+
+Run from the RCA folder: python -m benchmarks.bench_rule_engine --rows 10000 100000 1000000 --json rule_engine.json
+The row-by-row evaluator takes about 0.1 ms per row, so it only runs on the first --row-limit rows of
+each table; the other evaluators run on all rows and are checked against it on those rows. An
+evaluator of your own is added with --evaluator module:function, called as function(df, rule) and
+returning the predictions, root causes and match paths in row order.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import time
+import tracemalloc
+import pandas as pd
+from analysis_utils import analyze_row_with_path, collect_rule_features, encode_features, evaluate_rule
+from benchmarks.synthetic_stations import station_frame
+from pipeline import select_models, station_rule
+
+def evaluate_rows(df, rule):
+    """The pre-vectorization analysis loop: analyze_row_with_path per iterrows() row."""
+    preds, causes, paths = [], [], []
+    for _, row in df.iterrows():
+        pred, cause, path = analyze_row_with_path(row, rule)
+        preds.append(pred)
+        causes.append(cause)
+        paths.append(path)
+    return preds, causes, paths
+
+def evaluate_vectorized(df, rule):
+    """What pipeline.analyze_stations runs: features encoded once, the rule tree walked per distinct path."""
+    return evaluate_rule(encode_features(df, collect_rule_features(rule)), len(df), rule)
+
+EVALUATORS = {"row": evaluate_rows, "vectorized": evaluate_vectorized}
+
+def load_evaluator(spec):
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+def measure(fn, df, rule, repeat=1, memory=True):
+    """(best seconds of `repeat` runs, traced peak bytes or None, output of the last run)."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(df, rule)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    peak = None
+    if memory:
+        # a separate run, tracing slows Python code down too much to time it
+        tracemalloc.start()
+        try:
+            fn(df, rule)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak, out
+
+def same_output(out, expected, rows):
+    return all(list(pd.Series(list(a)[:rows], dtype=object)) == list(b) for a, b in zip(out, expected))
+
+def main():
+    from loaders import load_rules
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", default="JSON_Files/rules.json")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="table sizes, 10k to 10M rows")
+    parser.add_argument("--stations", nargs="*", help="stations to benchmark (default: all in the rules)")
+    parser.add_argument("--evaluators", nargs="+", default=list(EVALUATORS), help="built-in: %(default)s")
+    parser.add_argument("--evaluator", action="append", default=[], metavar="MODULE:FUNCTION",
+                        help="an alternative evaluator to benchmark as well")
+    parser.add_argument("--row-limit", type=int, default=50_000, help="most rows given to the row evaluator")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measurement, the best counts")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    evaluators = [(name, EVALUATORS[name]) for name in args.evaluators]
+    evaluators += [(spec, load_evaluator(spec)) for spec in args.evaluator]
+    results = []
+    print(f"{'station':>12} {'rows':>9} {'evaluator':>14} {'timed rows':>10} {'seconds':>9} {'rows/s':>12} "
+          f"{'peak MB':>8} {'matches':>7}")
+    for station, model in select_models(rules, args.stations or list(rules)):
+        rule = station_rule(rules, station, model)
+        for rows in args.rows:
+            df = station_frame(rules[station], rows, args.seed)
+            ref_rows = min(rows, args.row_limit)
+            expected = evaluate_rows(df.iloc[:ref_rows], rule)
+            for name, fn in evaluators:
+                frame = df.iloc[:ref_rows] if fn is evaluate_rows else df
+                # the row evaluator is timed once, its output is already known
+                seconds, peak, out = measure(fn, frame, rule, 1 if fn is evaluate_rows else args.repeat,
+                                             not args.no_memory)
+                entry = {"station": station, "model": model, "rows": rows, "evaluator": name,
+                         "timed_rows": len(frame), "seconds": round(seconds, 4),
+                         "rows_per_s": round(len(frame) / seconds) if seconds else None,
+                         "peak_mb": round(peak / 2**20, 1) if peak is not None else None,
+                         "matches_row": same_output(out, expected, ref_rows)}
+                results.append(entry)
+                print(f"{station:>12} {rows:>9} {name:>14} {entry['timed_rows']:>10} {entry['seconds']:>9} "
+                      f"{entry['rows_per_s'] or '-':>12} {entry['peak_mb'] if peak is not None else '-':>8} "
+                      f"{str(entry['matches_row']):>7}")
+            df = expected = None
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "pandas": pd.__version__, "cpus": os.cpu_count(),
+                       "row_limit": args.row_limit, "repeat": args.repeat, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Cold start of the GUI: import time per module (python -X importtime) and time until the window shows.
+
+Run from the RCA folder: python -m benchmarks.bench_startup --top 15
+Each measurement runs in a fresh interpreter; set QT_QPA_PLATFORM=offscreen on machines without a display.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "sqlalchemy"]
+
+# What main.py does before app.exec_(), without the auto-run prompt
+WINDOW_SCRIPT = """
+import sys, time
+t0 = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from app_state import AppState
+from loaders import load_rules, load_troubleshooting
+from rule_analyzer_app import RuleAnalyzerApp
+AppState.rules = load_rules()
+AppState.troubleshooting = load_troubleshooting()
+win = RuleAnalyzerApp()
+win.show()
+app.processEvents()
+print("WINDOW", time.perf_counter() - t0)
+print("LOADED", ",".join(m for m in %r if m in sys.modules))
+""" % (HEAVY_MODULES,)
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us, depth)} from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (self_us, cumulative_us, depth)
+    return modules
+
+def import_times(statement):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                          capture_output=True, text=True, cwd=os.getcwd())
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+    return parse_importtime(proc.stderr)
+
+def window_time():
+    proc = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], capture_output=True, text=True, cwd=os.getcwd())
+    seconds, loaded = None, []
+    for line in proc.stdout.splitlines():
+        if line.startswith("WINDOW "):
+            seconds = float(line.split()[1])
+        elif line.startswith("LOADED "):
+            loaded = [m for m in line.split(" ", 1)[1].split(",") if m]
+    if seconds is None:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "window did not show")
+    return seconds, loaded
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=15, help="slowest packages to list")
+    parser.add_argument("--runs", type=int, default=3, help="window start-ups to time (best is reported)")
+    parser.add_argument("--json", help="write the timings to this file")
+    args = parser.parse_args()
+
+    modules = import_times("import main")
+    # self time summed per top-level package, so pandas.core.* etc. count towards pandas
+    packages = {}
+    for name, (self_us, _, _) in modules.items():
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    slowest = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+    print("slowest packages imported by main.py (self time, ms):")
+    for name, self_us in slowest:
+        print(f"{self_us / 1000:>10.1f}  {name}")
+
+    windows = [window_time() for _ in range(max(args.runs, 1))]
+    result = {"import_main_s": round(modules["main"][1] / 1e6, 3),
+              "window_shown_s": round(min(w[0] for w in windows), 3),
+              "heavy_modules_at_import": [m for m in HEAVY_MODULES if m in modules],
+              "heavy_modules_at_window": windows[0][1],
+              "slowest_packages_ms": {name: round(self_us / 1000, 1) for name, self_us in slowest}}
+    for key in ("import_main_s", "window_shown_s", "heavy_modules_at_import", "heavy_modules_at_window"):
+        print(f"{key:>24}: {result[key]}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Synthetic station tables shaped after rules.json, for benchmarks and load tests.
+
+Run from the RCA folder: python -m benchmarks.synthetic_stations --rows 1000000 --out synthetic
+Each station gets Date_Time (one row per minute), State, Model (the values its rules branch on),
+Serial, one judge column per rule feature and Result. An NG unit fails one test (FAIL) and skips
+the tests after it (___); some tests are disabled per unit. Judge columns are categorical, one
+byte per row, so 10M rows of a 20-feature station take about 400 MB.
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from analysis_utils import station_required_columns
+
+JUDGE_VALUES = ["PASS", "FAIL", "___", "Disable"]
+PASS, FAIL, NOT_TESTED, DISABLED = range(4)
+NG_RATE = 0.05
+DISABLE_RATE = 0.01
+STATES = ["Auto", "Manual"]
+STATE_WEIGHTS = [0.95, 0.05]
+RESERVED_KEYS = {"FEATURE", "PASS", "FAIL", "DISABLE", "PREDICTION", "ROOT_CAUSE", "OK", "NG"}
+
+def model_values(station_rules):
+    """Values the station's rules branch on under a `Model` feature, in rule order."""
+    found = []
+    def walk(node):
+        if isinstance(node, list):
+            for item in node:
+                walk(item)
+            return
+        if not isinstance(node, dict):
+            return
+        for key, child in node.items():
+            if node.get("feature") == "Model" and isinstance(key, str) and key.upper() not in RESERVED_KEYS \
+                    and key not in found:
+                found.append(key)
+            if isinstance(child, (dict, list)):
+                walk(child)
+    for model in (station_rules or {}).get("models", {}).values():
+        if isinstance(model, dict):
+            walk(model.get("rules"))
+    return found
+
+def _categorical(rng, values, weights, rows):
+    codes = rng.choice(len(values), size=rows, p=weights).astype(np.int8)
+    return pd.Categorical.from_codes(codes, categories=values)
+
+def station_frame(station_rules, rows, seed=0, start="2025-05-05 08:00", ng_rate=NG_RATE, disable_rate=DISABLE_RATE):
+    """One station table of `rows` rows whose judge columns are the features of every rule of the station,
+    tested in column order."""
+    rng = np.random.default_rng(seed)
+    features = sorted(station_required_columns(station_rules) - {"Model", "State", "Result", "Date_Time"})
+    models = model_values(station_rules) or ["MODEL_A"]
+    data = {"Date_Time": pd.date_range(start, periods=rows, freq="min"),
+            "State": _categorical(rng, STATES, STATE_WEIGHTS, rows),
+            "Model": _categorical(rng, models, [1 / len(models)] * len(models), rows),
+            "Serial": pd.Categorical.from_codes(np.arange(rows) % 1_000_000,
+                                                categories=[f"SN{i:06d}" for i in range(min(rows, 1_000_000))])}
+    ng = rng.random(rows) < ng_rate if features else np.zeros(rows, dtype=bool)
+    fail_at = rng.integers(0, max(len(features), 1), rows)
+    for i, feature in enumerate(features):
+        codes = np.where(rng.random(rows) < disable_rate, DISABLED, PASS).astype(np.int8)
+        codes[ng & (fail_at == i)] = FAIL
+        codes[ng & (fail_at < i)] = NOT_TESTED
+        data[feature] = pd.Categorical.from_codes(codes, categories=JUDGE_VALUES)
+    data["Result"] = pd.Categorical.from_codes(ng.astype(np.int8), categories=["OK", "NG"])
+    return pd.DataFrame(data)
+
+def synthetic_stations(rules, rows, seed=0, stations=None):
+    """{station: frame} for the given stations (default: every station in rules)."""
+    return {station: station_frame(rules[station], rows, seed + i)
+            for i, station in enumerate(stations or list(rules))}
+
+def write_stations(frames, out_dir, fmt="parquet"):
+    """One <station>.parquet or .csv per frame; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for station, df in frames.items():
+        path = os.path.join(out_dir, f"{station}.{fmt}")
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+        else:
+            df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+def main():
+    from loaders import load_rules
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rules", default="JSON_Files/rules.json")
+    parser.add_argument("--rows", type=int, default=100_000, help="rows per station")
+    parser.add_argument("--stations", nargs="*", help="stations to generate (default: all in the rules)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--out", default="synthetic_stations")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    frames = synthetic_stations(load_rules(args.rules), args.rows, args.seed, args.stations)
+    paths = write_stations(frames, args.out, args.format)
+    for path, df in zip(paths, frames.values()):
+        print(f"{path}: {len(df)} rows, {len(df.columns)} columns, "
+              f"{df['Result'].eq('NG').mean():.1%} NG, {df.memory_usage(deep=True).sum() / 2**20:.1f} MB in memory")
+    print(f"Generated in {time.perf_counter() - t0:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import tempfile
+
+def default_cache_dir():
+    return os.path.join(tempfile.gettempdir(), "rca_chart_cache")
+
+def _json_default(value):
+    # Timestamps, numpy scalars and tuples of the chart data
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+class ChartCache:
+    """Rendered charts on disk, addressed by a hash of their input data and style.
+
+    The key covers the chart spec (kind, data, figure size), the dpi and a style key supplied by the
+    renderer, so a chart is re-rendered only when something that changes its pixels changed.
+    Hits refresh the file time; the least recently used files are evicted above max_bytes.
+    """
+    def __init__(self, root=None, max_bytes=200 * 1024 * 1024, style_key=""):
+        self.root = root or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.style_key = style_key
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, spec, dpi=100, ext="png"):
+        payload = json.dumps({"kind": spec["kind"], "data": spec["data"], "figsize": spec.get("figsize"),
+                              "dpi": dpi, "ext": ext, "style": self.style_key},
+                             sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key, ext):
+        return os.path.join(self.root, key[:2], f"{key}.{ext}")
+
+    def get(self, key, ext="png"):
+        path = self._path(key, ext)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key, data, ext="png"):
+        path = self._path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes; returns files removed."""
+        entries = []
+        total = 0
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,142 @@
+"""Stage checkpoints of an auto-run, so a retry resumes after the last completed stage.
+
+A run directory is keyed by the window and a hash of everything that decides its data (connection,
+tables, state filter, serial column and rules): <root>/<from>_<to>_<hash>/. Each stage is a folder
+of Parquet files written under a temporary name and renamed when complete:
+
+    retrieved/  one file per station plus run.json (stations, state, window metadata)
+    analyzed/   the analysis result frame per station
+
+The report is rebuilt from these frames (its charts come from the chart cache); the run directory
+is removed once the report is written and date_setup has advanced.
+"""
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime, timedelta
+from app_state import log
+
+RETRIEVED = "retrieved"
+ANALYZED = "analyzed"
+# run directories of windows that were never completed are dropped after this long
+MAX_AGE_DAYS = 14
+KEY_FIELDS = ["host", "port", "database", "selected_tables", "state", "apply_state", "serial_column"]
+
+def default_checkpoint_dir():
+    return os.path.join(os.getcwd(), "Run_Checkpoints")
+
+def run_key(config, rules, window):
+    payload = json.dumps({"config": {k: config.get(k) for k in KEY_FIELDS}, "rules": rules, "window": list(window)},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def _meta_to_json(meta):
+    return {k: (v.isoformat() if hasattr(v, "isoformat") else v) for k, v in meta.items()}
+
+def _meta_from_json(meta):
+    import pandas as pd
+    meta = dict(meta)
+    for k in ("start", "end"):
+        if meta.get(k) is not None:
+            meta[k] = pd.Timestamp(meta[k])
+    return meta
+
+class RunCheckpoint:
+    """Checkpoint folder of one auto-run window. Saving never fails a run: errors are logged and
+    the checkpoint is switched off for the rest of the run."""
+    def __init__(self, path, emit=log):
+        self.path = path
+        self.emit = emit
+        self.enabled = True
+
+    @classmethod
+    def open(cls, config, rules, window, emit=log):
+        """Checkpoint of this run, None when disabled in the configuration or pyarrow is missing."""
+        from result_store import parquet_available
+        if not config.get("checkpoints", True):
+            return None
+        if not parquet_available():
+            emit("pyarrow is not installed, auto-run stages are not checkpointed")
+            return None
+        root = config.get("checkpoint_dir") or default_checkpoint_dir()
+        prune(root, emit=emit)
+        name = f"{window[0][:10]}_{window[1][:10]}_{run_key(config, rules, window)}"
+        return cls(os.path.join(root, name), emit)
+
+    def done(self, stage):
+        return os.path.isdir(os.path.join(self.path, stage))
+
+    def _write_stage(self, stage, frames, info):
+        """Write {file name: frame} and info.json to <stage>.tmp, then rename it to <stage>."""
+        if not self.enabled:
+            return
+        tmp = os.path.join(self.path, stage + ".tmp")
+        try:
+            shutil.rmtree(tmp, ignore_errors=True)
+            os.makedirs(tmp)
+            for name, df in frames.items():
+                df.to_parquet(os.path.join(tmp, name))
+            with open(os.path.join(tmp, "run.json"), "w") as f:
+                json.dump(info, f, indent=4)
+            shutil.rmtree(os.path.join(self.path, stage), ignore_errors=True)
+            os.replace(tmp, os.path.join(self.path, stage))
+            self.emit(f"Checkpointed {stage} stage to {self.path}")
+        except Exception as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            self.enabled = False
+            self.emit(f"Checkpoint of {stage} stage failed, continuing without checkpoints: {e}")
+
+    def _read_stage(self, stage):
+        import pandas as pd
+        folder = os.path.join(self.path, stage)
+        with open(os.path.join(folder, "run.json"), "r") as f:
+            info = json.load(f)
+        frames = {station: pd.read_parquet(os.path.join(folder, name)) for station, name in info["files"].items()}
+        return info, frames
+
+    def save_retrieved(self, run):
+        files = {station: f"{i:04d}.parquet" for i, station in enumerate(run["retrieved"])}
+        info = {"stations": run["stations"], "state": run["state"], "window": list(run["window"]),
+                "database": run["database"], "serial_column": run["serial_column"], "files": files,
+                "metas": {station: _meta_to_json(meta) for station, meta in run["metas"].items()}}
+        self._write_stage(RETRIEVED, {files[s]: df for s, df in run["retrieved"].items()}, info)
+
+    def save_results(self, results):
+        files = {station: f"{i:04d}.parquet" for i, station in enumerate(results)}
+        self._write_stage(ANALYZED, {files[s]: df for s, df in results.items()}, {"files": files})
+
+    def load(self, engine=None):
+        """The run dict of the last completed stage (results None when only retrieval completed),
+        None when no stage completed or the checkpoint cannot be read."""
+        if not self.done(RETRIEVED):
+            return None
+        try:
+            info, retrieved = self._read_stage(RETRIEVED)
+            results = self._read_stage(ANALYZED)[1] if self.done(ANALYZED) else None
+        except Exception as e:
+            self.emit(f"Cannot read checkpoint {self.path}, starting over: {e}")
+            self.clear()
+            return None
+        self.emit(f"Resuming auto-run from checkpoint {self.path} ({ANALYZED if results is not None else RETRIEVED} stage)")
+        return {"engine": engine, "database": info["database"], "stations": info["stations"], "state": info["state"],
+                "window": tuple(info["window"]), "serial_column": info["serial_column"], "retrieved": retrieved,
+                "metas": {s: _meta_from_json(m) for s, m in info["metas"].items()}, "results": results,
+                "report_path": None}
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def prune(root, max_age_days=MAX_AGE_DAYS, emit=log):
+    """Drop run directories not touched for max_age_days."""
+    if not os.path.isdir(root):
+        return
+    limit = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < limit:
+                shutil.rmtree(path, ignore_errors=True)
+                emit(f"Removed stale auto-run checkpoint {path}")
+        except OSError:
+            pass
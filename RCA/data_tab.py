@@ -2,10 +2,7 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QGroupBox, QLabel, QPushButton, QHBoxLayout, QCheckBox, QComboBox, QListWidget, QListWidgetItem, QProgressDialog, QDialog, QTableWidget, QTableWidgetItem, QDialogButtonBox, QDateTimeEdit, QSizePolicy, QHeaderView, QMessageBox
 )
 from PyQt5.QtCore import Qt, QDateTime, QTime
-import pandas as pd
-from sqlalchemy import inspect, text
 from app_state import AppState, log
-from data_utils import safe_to_datetime, strip_dataframe
 
 class DataTab(QWidget):
     def __init__(self, app=None, parent=None):
@@ -95,6 +92,7 @@ class DataTab(QWidget):
             item.setCheckState(Qt.Checked if state == Qt.Checked else Qt.Unchecked)
 
     def refresh_tables(self):
+        from sqlalchemy import inspect
         try:
             self.setCursor(Qt.WaitCursor)
             insp = inspect(AppState.engine)
@@ -114,6 +112,10 @@ class DataTab(QWidget):
             self.unsetCursor()
 
     def retrieve_data(self):
+        # pandas and the retrieval helpers are loaded on the first retrieval, not at start-up
+        import pandas as pd
+        from data_utils import ingest_retrieved_frame, format_bytes
+        from retrieval import fetch_station_table, memory_budget_bytes, station_keep_columns, MemoryBudgetExceeded
         selected_tables = [self.table_list.item(i).text() for i in range(self.table_list.count()) if self.table_list.item(i).checkState() == Qt.Checked]
         if not selected_tables:
             QMessageBox.warning(self, 'No Tables', 'Please select at least one table')
@@ -131,29 +133,29 @@ class DataTab(QWidget):
         self.prog.resize(int(default_size.width() * 2.0), int(default_size.height() * 2.0))
         self.prog.setMinimumSize(500, 150)
 
+        budget_mb = self.app.app_config_tab.memory_budget.value() if self.app else 0
+        budget = memory_budget_bytes(budget_mb)
+        used = 0
+
         dfs = []
+        metas = []
         canceled = False
         for idx, table in enumerate(selected_tables):
             if self.prog.wasCanceled():
                 canceled = True
                 break
             log(f"Retrieving data from table: {table}")
-            base_query = f"SELECT * FROM `{table}`"
-            conditions = []
-            params = {}
-            if state:
-                conditions.append("State = :state")
-                params['state'] = state
-            conditions.append("Date_Time BETWEEN :from_dt AND :to_dt")
-            params['from_dt'] = dt_from
-            params['to_dt'] = dt_to
-            if conditions:
-                query = base_query + " WHERE " + " AND ".join(conditions)
-            else:
-                query = base_query
             try:
                 self.setCursor(Qt.WaitCursor)
-                df = pd.read_sql_query(text(query), AppState.engine, params=params)
+                # the budget shrinks with every table already held in memory
+                df, meta = fetch_station_table(AppState.engine, table, state, dt_from, dt_to, max(budget - used, 0),
+                                               keep_columns=station_keep_columns(AppState.rules, table, AppState.serial_column))
+            except MemoryBudgetExceeded as e:
+                # the whole-table fallback below would need even more memory
+                log(f"Retrieve failed for {table}: {e}", "ERROR")
+                QMessageBox.critical(self, 'Error', f'Failed to retrieve data for {table}: {e}')
+                self.prog.close()
+                return
             except Exception as e:
                 try:
                     df = pd.read_sql_table(table, AppState.engine)
@@ -162,6 +164,7 @@ class DataTab(QWidget):
                     if 'Date_Time' in df.columns:
                         df['Date_Time'] = pd.to_datetime(df['Date_Time'], errors='coerce')
                         df = df[(df['Date_Time'] >= pd.to_datetime(dt_from)) & (df['Date_Time'] <= pd.to_datetime(dt_to))]
+                    df, meta = ingest_retrieved_frame(df)
                 except Exception as e2:
                     log(f"Retrieve failed for {table}: {e} | {e2}", "ERROR")
                     QMessageBox.critical(self, 'Error', f'Failed to retrieve data for {table}: {e}\n{e2}')
@@ -169,9 +172,10 @@ class DataTab(QWidget):
                     return
             finally:
                 self.unsetCursor()
-            df = strip_dataframe(df)
-            log(f"Retrieved {len(df)} rows from {table}")
+            used += meta['mem_after']
+            log(f"Retrieved {len(df)} rows from {table}, memory {format_bytes(meta['mem_before'])} -> {format_bytes(meta['mem_after'])}")
             dfs.append(df)
+            metas.append(meta)
             self.prog.setValue(idx + 1)
         self.prog.close()
         log("Data retrieval completed.")
@@ -184,28 +188,32 @@ class DataTab(QWidget):
         summary_dlg = QDialog(self)
         summary_layout = QVBoxLayout()
         summary_table = QTableWidget()
-        summary_table.setColumnCount(5)
-        summary_table.setHorizontalHeaderLabels(["Table", "Rows", "Columns", "Start Date", "End Date"])
+        summary_table.setColumnCount(7)
+        summary_table.setHorizontalHeaderLabels(["Table", "Rows", "Columns", "Start Date", "End Date", "Memory Before", "Memory After"])
         summary_table.setRowCount(len(selected_tables))
-        for i, (tbl, df) in enumerate(zip(selected_tables, dfs)):
-            rows = len(df)
+        for i, (tbl, df, meta) in enumerate(zip(selected_tables, dfs, metas)):
+            rows = meta["rows"]
             cols = len(df.columns)
-            start = end = "N/A"
-            if 'Date_Time' in df.columns:
-                dt = safe_to_datetime(df['Date_Time'])
-                if not pd.isna(dt.min()):
-                    start = dt.min().strftime('%Y-%m-%d %H:%M:%S')
-                if not pd.isna(dt.max()):
-                    end = dt.max().strftime('%Y-%m-%d %H:%M:%S')
+            start = meta["start"].strftime('%Y-%m-%d %H:%M:%S') if meta["start"] is not None else "N/A"
+            end = meta["end"].strftime('%Y-%m-%d %H:%M:%S') if meta["end"] is not None else "N/A"
             summary_table.setItem(i, 0, QTableWidgetItem(tbl))
             summary_table.setItem(i, 1, QTableWidgetItem(str(rows)))
             summary_table.setItem(i, 2, QTableWidgetItem(str(cols)))
             summary_table.setItem(i, 3, QTableWidgetItem(start))
             summary_table.setItem(i, 4, QTableWidgetItem(end))
+            summary_table.setItem(i, 5, QTableWidgetItem(format_bytes(meta["mem_before"])))
+            after_text = format_bytes(meta["mem_after"]) + (" (streamed)" if meta.get("mode") == "stream" else "")
+            summary_table.setItem(i, 6, QTableWidgetItem(after_text))
         summary_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
         summary_layout.addWidget(summary_table)
+        total_before = sum(m["mem_before"] for m in metas)
+        total_after = sum(m["mem_after"] for m in metas)
+        summary_layout.addWidget(QLabel(f"Total memory: {format_bytes(total_before)} -> {format_bytes(total_after)}"))
 
         buttons = QDialogButtonBox()
+        preview_btn = buttons.addButton("Preview Table", QDialogButtonBox.ActionRole)
+        preview_btn.setToolTip('Open the selected table in a sortable preview')
+        preview_btn.clicked.connect(lambda: self._preview_table(summary_dlg, selected_tables, dfs, summary_table.currentRow()))
         use_btn = buttons.addButton("Use Tables", QDialogButtonBox.AcceptRole)
         buttons.addButton("Cancel", QDialogButtonBox.RejectRole)
         buttons.accepted.connect(summary_dlg.accept)
@@ -217,11 +225,19 @@ class DataTab(QWidget):
         summary_dlg.resize(900, 500)
 
         if summary_dlg.exec_() == QDialog.Accepted:
-            AppState.retrieved_dfs = dict(zip(selected_tables, dfs))
+            AppState.set_retrieved(dict(zip(selected_tables, dfs)), dict(zip(selected_tables, metas)))
             AppState.selected_tables = selected_tables
             log(f"User accepted retrieved data from {selected_tables}, total rows={sum(len(d) for d in dfs)}")
             if self.app:
                 self.app.update_for_new_data()
                 self.app.setCurrentIndex(2)
         else:
-            log('User cancelled retrieved data preview')
\ No newline at end of file
+            log('User cancelled retrieved data preview')
+
+    def _preview_table(self, parent, tables, dfs, row):
+        """Preview one retrieved frame from the summary dialog, before it is accepted."""
+        from dialogs import PreviewDialog
+        if not dfs:
+            return
+        row = min(max(row, 0), len(dfs) - 1)
+        PreviewDialog(dfs[row], parent=parent, title=f"Preview - {tables[row]}").exec_()
@@ -16,6 +16,90 @@ def strip_dataframe(df: pd.DataFrame) -> pd.DataFrame:
             df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
     return df
 
+def prepare_retrieved_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Clean a freshly retrieved table and parse Date_Time to datetime64 once."""
+    df = strip_dataframe(df)
+    if df is not None and 'Date_Time' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date_Time']):
+        df['Date_Time'] = safe_to_datetime(df['Date_Time'])
+    return df
+
+def window_meta(df: pd.DataFrame) -> dict:
+    """Row count and Date_Time min/max of a prepared table (None when unknown)."""
+    meta = {"rows": 0 if df is None else len(df), "start": None, "end": None}
+    if df is None or 'Date_Time' not in df.columns:
+        return meta
+    dt = df['Date_Time']
+    if not pd.api.types.is_datetime64_any_dtype(dt):
+        dt = safe_to_datetime(dt)
+    start, end = dt.min(), dt.max()
+    if not pd.isna(start):
+        meta["start"] = start
+    if not pd.isna(end):
+        meta["end"] = end
+    return meta
+
+def compact_dataframe(df: pd.DataFrame, max_category_ratio=0.5):
+    """Drop all-null columns, categorize low-cardinality text and downcast numbers.
+
+    Returns the compacted frame with its deep memory usage in bytes before and after.
+    """
+    if df is None:
+        return df, 0, 0
+    before = int(df.memory_usage(deep=True).sum())
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        if len(s) and s.isna().all():
+            continue
+        if pd.api.types.is_bool_dtype(s):
+            pass
+        elif pd.api.types.is_integer_dtype(s):
+            s = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s):
+            down = s.astype("float32")
+            # only when lossless, exported values must stay the same
+            if ((down.astype(s.dtype) == s) | s.isna()).all():
+                s = down
+        elif s.dtype == object and s.nunique(dropna=True) <= len(s) * max_category_ratio:
+            s = s.astype("category")
+        columns[col] = s
+    df = pd.DataFrame(columns, index=df.index)
+    after = int(df.memory_usage(deep=True).sum())
+    return df, before, after
+
+def ingest_retrieved_frame(df: pd.DataFrame):
+    """Prepare and compact a retrieved table; returns it with its window and memory metadata."""
+    df = prepare_retrieved_frame(df)
+    df, mem_before, mem_after = compact_dataframe(df)
+    meta = window_meta(df)
+    meta["mem_before"] = mem_before
+    meta["mem_after"] = mem_after
+    return df, meta
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(n) < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}" if unit != "B" else f"{int(n)} B"
+        n /= 1024
+
+RESULT_CATEGORIES = ["OK", "NG", "OTHER"]
+
+def normalize_result(df: pd.DataFrame) -> pd.Series:
+    """Result column as a Categorical of OK/NG/OTHER sharing the frame's index."""
+    if df is None:
+        return pd.Series(pd.Categorical([], categories=RESULT_CATEGORIES), dtype="category")
+    if "Result" not in df.columns:
+        return pd.Series(pd.Categorical(["OTHER"] * len(df), categories=RESULT_CATEGORIES), index=df.index)
+    norm = df["Result"].astype(str).str.strip().str.upper()
+    norm = norm.where(norm.isin(["OK", "NG"]), "OTHER")
+    return pd.Series(pd.Categorical(norm, categories=RESULT_CATEGORIES), index=df.index)
+
+def result_counts(result: pd.Series) -> dict:
+    counts = result.value_counts()
+    out = {cat: int(counts.get(cat, 0)) for cat in RESULT_CATEGORIES}
+    out["total"] = len(result)
+    return out
+
 def safe_upper_map(s):
     try:
         return str(s).strip().upper()
@@ -2,7 +2,6 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QGroupBox, QGridLayout, QLabel, QLineEdit, QPushButton, QHBoxLayout, QComboBox, QMessageBox, QSizePolicy
 )
 from PyQt5.QtCore import Qt
-from sqlalchemy import create_engine, text
 import os
 from app_state import AppState, log
 
@@ -78,6 +77,7 @@ class ConfigTab(QWidget):
         self.use_db_btn.clicked.connect(self.use_db)
 
     def connect_server(self):
+        from sqlalchemy import create_engine, text
         host = self.host.text().strip()
         port = self.port.text().strip() or '3306'
         user = self.user.text().strip()
@@ -107,6 +107,7 @@ class ConfigTab(QWidget):
             self.unsetCursor()
 
     def use_db(self):
+        from sqlalchemy import create_engine
         db = self.db_combo.currentText()
         if not db:
             QMessageBox.warning(self, 'No DB', 'Please select a database')
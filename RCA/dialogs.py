@@ -1,11 +1,110 @@
 from PyQt5.QtWidgets import (
-    QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QDialogButtonBox, QPushButton, QFileDialog, QHBoxLayout, QMessageBox, QHeaderView, QSizePolicy
+    QDialog, QVBoxLayout, QLabel, QDialogButtonBox, QPushButton, QFileDialog, QHBoxLayout, QMessageBox, QHeaderView,
+    QGridLayout, QLineEdit, QComboBox, QSpinBox, QTableView
 )
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
+from datetime import datetime, timedelta
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
 import pandas as pd
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from result_store import ResultStore, parquet_available
+
+RESIZE_PRECISION = 100
+
+
+class DataFrameModel(QAbstractTableModel):
+    """Read-only table model over a DataFrame.
+
+    Cells are formatted on request from the column's NumPy array (category codes for categorical
+    columns), so only the visible cells are ever converted. Sorting permutes a row index with a
+    stable argsort that is cached per column and order; the frame itself is never copied.
+    """
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self.df = df
+        self._n_rows = len(df)
+        self._n_cols = len(df.columns)
+        self._arrays = {}
+        self._orders = {}
+        self._rows = None
+
+    def _column(self, j):
+        arr = self._arrays.get(j)
+        if arr is None:
+            s = self.df.iloc[:, j]
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                arr = (s.cat.codes.to_numpy(), s.cat.categories.to_numpy())
+            elif pd.api.types.is_datetime64_any_dtype(s.dtype):
+                arr = (None, s.to_numpy())
+            else:
+                arr = s.to_numpy()
+            self._arrays[j] = arr
+        return arr
+
+    def cell(self, row, j):
+        """Display text of a cell, row being the position in the current (sorted) order."""
+        if self._rows is not None:
+            row = self._rows[row]
+        arr = self._column(j)
+        if isinstance(arr, tuple):
+            codes, values = arr
+            if codes is not None:
+                code = codes[row]
+                return "" if code < 0 else str(values[code])
+            val = values[row]
+            return "" if pd.isna(val) else str(pd.Timestamp(val))
+        val = arr[row]
+        return "" if pd.isna(val) else str(val)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._n_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._n_cols
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.cell(index.row(), index.column())
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self.df.columns[section])
+        return str(section + 1)
+
+    def _order(self, j, ascending):
+        key = (j, ascending)
+        order = self._orders.get(key)
+        if order is None:
+            s = self.df.iloc[:, j].reset_index(drop=True)
+            try:
+                order = s.sort_values(ascending=ascending, kind="mergesort", na_position="last").index.to_numpy()
+            except TypeError:
+                # mixed types in an object column sort by their text
+                order = s.astype(str).where(s.notna()).sort_values(
+                    ascending=ascending, kind="mergesort", na_position="last").index.to_numpy()
+            self._orders[key] = order
+        return order
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        # a negative column restores the frame order
+        self._rows = self._order(column, order == Qt.AscendingOrder) if 0 <= column < self._n_cols else None
+        self.layoutChanged.emit()
+
+
+def data_table_view(parent=None):
+    """QTableView set up like the app's read-only tables, with uniform row heights for large models."""
+    view = QTableView(parent)
+    view.setEditTriggers(QTableView.NoEditTriggers)
+    view.setSelectionBehavior(QTableView.SelectRows)
+    view.setAlternatingRowColors(True)
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(view.fontMetrics().height() + 8)
+    # column widths are measured on the first rows only
+    view.horizontalHeader().setResizeContentsPrecision(RESIZE_PRECISION)
+    return view
+
 
 class PreviewDialog(QDialog):
     def __init__(self, df, parent=None, allow_all_rows=True, title="Preview"):
@@ -16,37 +115,29 @@ class PreviewDialog(QDialog):
         layout.setSpacing(12)
         layout.setContentsMargins(16, 16, 16, 16)
 
-        self.table = QTableWidget(self)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setAlternatingRowColors(True)
-        self.table.setSortingEnabled(True)
-
-        table = self.table
-        table.setColumnCount(len(df.columns))
-        table.setHorizontalHeaderLabels([str(c) for c in df.columns])
-        
-        max_rows = len(df)
-        if not allow_all_rows:
-            max_rows = min(500, len(df))
+        if not allow_all_rows and len(df) > 500:
+            df = df.iloc[:500]
             self.warning_label = QLabel("(Preview truncated to 500 rows for performance)")
             layout.addWidget(self.warning_label)
-        table.setRowCount(max_rows)
-        for i in range(max_rows):
-            row = df.iloc[i]
-            for j, val in enumerate(row):
-                table.setItem(i, j, QTableWidgetItem("" if pd.isna(val) else str(val)))
 
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        table.resizeRowsToContents()
-        layout.addWidget(table, 1)
+        self.model = DataFrameModel(df, self)
+        self.table = data_table_view(self)
+        self.table.setModel(self.model)
+        # no initial sort: keep the frame order until a header is clicked
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
+        self.table.resizeColumnsToContents()
+        layout.addWidget(self.table, 1)
 
         buttons = QDialogButtonBox(QDialogButtonBox.Ok, self)
         buttons.accepted.connect(self.accept)
         layout.addWidget(buttons)
 
+
 class VisualDialog(QDialog):
     def __init__(self, title: str, plot_fn, parent=None):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
         super().__init__(parent)
         self.setWindowTitle(title)
         self.resize(1000, 700)
@@ -78,4 +169,107 @@ class VisualDialog(QDialog):
             self.canvas.figure.savefig(path, bbox_inches="tight")
             QMessageBox.information(self, "Saved", f"Visual saved to:\n{path}")
         except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
\ No newline at end of file
+            QMessageBox.critical(self, "Error", str(e))
+
+
+class ResultHistoryDialog(QDialog):
+    """Query the local result store by serial, root cause, station and period."""
+    def __init__(self, store_dir=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Result History")
+        self.resize(1200, 800)
+        layout = QVBoxLayout(self)
+        layout.setSpacing(12)
+        layout.setContentsMargins(16, 16, 16, 16)
+        self.store = None
+        self.result = pd.DataFrame()
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Serial"), 0, 0)
+        self.serial = QLineEdit()
+        self.serial.setPlaceholderText("Any unit")
+        grid.addWidget(self.serial, 0, 1)
+        grid.addWidget(QLabel("Root Cause"), 0, 2)
+        self.cause = QComboBox()
+        self.cause.setEditable(True)
+        grid.addWidget(self.cause, 0, 3)
+        grid.addWidget(QLabel("Station"), 1, 0)
+        self.station = QComboBox()
+        grid.addWidget(self.station, 1, 1)
+        grid.addWidget(QLabel("Prediction"), 1, 2)
+        self.prediction = QComboBox()
+        self.prediction.addItems(["Any", "NG", "OK"])
+        grid.addWidget(self.prediction, 1, 3)
+        grid.addWidget(QLabel("Last Days"), 2, 0)
+        self.days = QSpinBox()
+        self.days.setRange(0, 3650)
+        self.days.setValue(30)
+        self.days.setSpecialValueText("All")
+        grid.addWidget(self.days, 2, 1)
+        self.search_btn = QPushButton("Search")
+        self.search_btn.clicked.connect(self.search)
+        grid.addWidget(self.search_btn, 2, 3)
+        layout.addLayout(grid)
+
+        self.info_label = QLabel("")
+        layout.addWidget(self.info_label)
+        self.table = data_table_view(self)
+        self.table.setSortingEnabled(True)
+        layout.addWidget(self.table, 1)
+
+        btn_row = QHBoxLayout()
+        self.export_btn = QPushButton("Export CSV")
+        self.export_btn.clicked.connect(self.export_csv)
+        btn_row.addStretch(1)
+        btn_row.addWidget(self.export_btn)
+        layout.addLayout(btn_row)
+        buttons = QDialogButtonBox(QDialogButtonBox.Close, self)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+        if not parquet_available():
+            self.info_label.setText("pyarrow is not installed, the result store is not available.")
+            self.search_btn.setEnabled(False)
+            return
+        try:
+            self.store = ResultStore(store_dir)
+        except Exception as e:
+            self.info_label.setText(f"Cannot open result store: {e}")
+            self.search_btn.setEnabled(False)
+            return
+        self.cause.addItems([""] + self.store.root_causes())
+        self.station.addItems(["All"] + self.store.stations())
+
+    def search(self):
+        serial = self.serial.text().strip() or None
+        cause = self.cause.currentText().strip() or None
+        station = self.station.currentText() if self.station.currentIndex() > 0 else None
+        prediction = self.prediction.currentText() if self.prediction.currentIndex() > 0 else None
+        since = datetime.now() - timedelta(days=self.days.value()) if self.days.value() else None
+        try:
+            self.result = self.store.query(serial=serial, root_cause=cause, station=station, prediction=prediction, since=since)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        df = self.result
+        units = df["Serial"].nunique() if "Serial" in df.columns else 0
+        self.info_label.setText(f"{len(df)} rows, {units} units")
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        old = self.table.model()
+        self.table.setModel(DataFrameModel(df, self.table))
+        if old is not None:
+            old.deleteLater()
+        self.table.resizeColumnsToContents()
+
+    def export_csv(self):
+        if self.result.empty:
+            QMessageBox.information(self, "Info", "Nothing to export.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Results", "result_history.csv", "CSV Files (*.csv)")
+        if not path:
+            return
+        try:
+            self.result.to_csv(path, index=False)
+            QMessageBox.information(self, "Saved", f"Results exported to:\n{path}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", str(e))
@@ -0,0 +1,144 @@
+"""Auto-run across several production lines, one database each, listed as `targets` in app_config.json.
+
+Each target is a dict overriding the connection and selection keys of the configuration (name,
+host, port, user, password, database, selected_tables, state, apply_state, serial_column). Lines
+are retrieved and analyzed concurrently, each on its own engine and connection pool; their reports
+are then written line by line, followed by one summary page across all lines.
+"""
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from app_state import log
+from pipeline import (CONFIG_PATH, Canceled, connect, auto_run_window, run_checkpointed, persist_run,
+                      run_report_model, run_week, write_run_report, report_name, embedded_logo, advance_date_setup)
+
+def target_configs(config):
+    """(name, configuration) per target; the configuration itself when no targets are listed."""
+    targets = config.get("targets") or []
+    if not targets:
+        return [(config.get("database") or "default", config)]
+    base = {key: value for key, value in config.items() if key != "targets"}
+    lines = []
+    for i, target in enumerate(targets):
+        name = target.get("name") or target.get("database") or f"line_{i + 1}"
+        lines.append((name, dict(base, **target)))
+    return lines
+
+def line_config(name, config):
+    """A line's configuration with its own result store folder, as station names repeat across lines."""
+    from result_store import default_store_dir
+    return dict(config, result_store_dir=os.path.join(config.get("result_store_dir") or default_store_dir(), name))
+
+def run_line(config, rules, window, emit=log, should_stop=None, budget_mb=None):
+    """Connect to one line and retrieve and analyze its window, resuming from the line's checkpoint;
+    the engine is disposed afterwards."""
+    engine = connect(config, emit)
+    try:
+        return run_checkpointed(engine, config, rules, window, emit, should_stop, budget_mb)
+    finally:
+        engine.dispose()
+
+def _tagged(emit, name):
+    # lines run side by side, so their log lines carry the line they belong to
+    return lambda msg: emit(f"[{name}] {msg}")
+
+def top_cause(model):
+    if not model.troubleshooting_rows:
+        return None
+    station, cause, _, count, _ = model.troubleshooting_rows[0]
+    return f"{station}: {cause} ({count})"
+
+def run_targets(config, rules, troubleshooting=None, config_path=CONFIG_PATH, emit=log, should_stop=None,
+                report=True, output_dir=None, workers=0):
+    """Auto-run of every target for the configured window.
+
+    At most `workers` lines (target_workers, 0 = all) are retrieved and analyzed at a time, each
+    with its share of the memory budget and its own result store folder. Reports are
+    named after the line. date_setup advances only when every line succeeded, so a failed line is
+    retried with the same window; every line is checkpointed, and the checkpoints are kept until all
+    lines succeeded, so the retry resumes the lines that got through. Returns {"lines": summary rows,
+    "summary_path", "failed"}.
+    """
+    from retrieval import memory_budget_bytes
+    targets = target_configs(config)
+    window = auto_run_window(config)
+    workers = max(1, min(workers or config.get("target_workers", 0) or len(targets), len(targets)))
+    emit(f"Auto-run of {len(targets)} line(s), {workers} at a time: from={window[0]}, to={window[1]}")
+    budget_mb = memory_budget_bytes(config.get("memory_budget_mb", 0)) // workers // (1024 * 1024)
+    out_dir = output_dir or config.get("auto_save_path", "") or ""
+
+    def submit(pool, name, target):
+        return pool.submit(run_line, target, rules, window, _tagged(emit, name), should_stop, budget_mb)
+
+    lines = []
+    weeks = []
+    checkpoints = []
+    pending = deque()
+    remaining = deque(targets)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while remaining and len(pending) < workers:
+                name, target = remaining.popleft()
+                pending.append((name, target, submit(pool, name, target)))
+            while pending:
+                name, target, future = pending.popleft()
+                tagged = _tagged(emit, name)
+                line = {"name": name, "database": target.get("database", "")}
+                try:
+                    run = future.result()
+                    if run["checkpoint"] is not None:
+                        checkpoints.append(run["checkpoint"])
+                    target = line_config(name, target)
+                    persist_run(run, target, tagged)
+                    model = run_report_model(run, troubleshooting, tagged)
+                    weeks.append(run_week(run, model))
+                    line.update(kpis=model.kpis, top_cause=top_cause(model))
+                    if report:
+                        path = write_run_report(run, target, troubleshooting, tagged, should_stop, out_dir,
+                                                f"_{name}", model)
+                        line["report"] = os.path.basename(path)
+                    run = model = None
+                except Canceled:
+                    raise
+                except Exception as e:
+                    emit(f"Auto-run of line {name} failed: {e}")
+                    line["error"] = str(e)
+                lines.append(line)
+                if remaining:
+                    name, target = remaining.popleft()
+                    pending.append((name, target, submit(pool, name, target)))
+        except Canceled:
+            for _, _, future in pending:
+                future.cancel()
+            raise
+
+    failed = sum(1 for line in lines if line.get("error"))
+    if config_path:
+        if failed:
+            emit(f"{failed} line(s) failed, config date stays at {config.get('date_setup')}")
+        else:
+            advance_date_setup(config, config_path, emit)
+    if not failed:
+        # kept while a line failed: the retry of the window resumes the other lines from them
+        for checkpoint in checkpoints:
+            checkpoint.clear()
+    summary_path = None
+    if report:
+        summary_path = write_summary(lines, config, window, weeks[0] if weeks else None, out_dir, emit)
+    return {"lines": lines, "summary_path": summary_path, "failed": failed}
+
+def write_summary(lines, config, window, week_no, out_dir="", emit=log):
+    """Cross-line summary page next to the line reports; returns its path."""
+    from report_html import write_summary_html
+    from report_model import report_week
+    filename, title = report_name(f"{config.get('html_filename', '').strip() or 'Report'}_All_Lines",
+                                  config.get("html_title", ""), config.get("include_week_no", True),
+                                  week_no or report_week(datetime.strptime(window[0], "%Y-%m-%d %H:%M:%S")))
+    path = os.path.join(out_dir, filename)
+    tmp_path = path + ".part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        write_summary_html(f, f"{title} - All Lines", embedded_logo(emit=emit), datetime.now(), window, lines)
+    os.replace(tmp_path, path)
+    emit(f"Summary of {len(lines)} line(s) saved at {path}")
+    return path
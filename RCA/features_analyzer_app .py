@@ -1362,8 +1362,12 @@ class RuleAnalyzerApp(QTabWidget):
         if not AppState.retrieved_dfs:
             QMessageBox.information(self, "Info", "No data retrieved.")
             return
-        dlg = PreviewDialog(self)
-        dlg.set_data(AppState.retrieved_dfs)
+        row = max(self.tables_table.currentRow(), 0)
+        item = self.tables_table.item(row, 1)
+        station = item.text() if item is not None else None
+        if station not in AppState.retrieved_dfs:
+            station = next(iter(AppState.retrieved_dfs))
+        dlg = PreviewDialog(AppState.retrieved_dfs[station], parent=self, title=f"Preview - {station}")
         dlg.exec_()
 
     def _get_embedded_logo(self):
@@ -0,0 +1,365 @@
+"""Station analysis spread over several machines through a SQLite job queue on a shared drive.
+
+    python -m pipeline queue submit --queue S:/rca/queue.sqlite --from "2025-05-01 08:00:00" --to "2025-06-01 07:59:59"
+    python -m pipeline queue work   --queue S:/rca/queue.sqlite      (on every machine)
+    python -m pipeline queue report --queue S:/rca/queue.sqlite --batch <id>
+
+A batch is one (station, window) job per station, optionally split into shorter windows. Workers
+claim jobs with a lease that a heartbeat thread renews while the job runs, retrieve and analyze them with their own database credentials and write
+each result as a Parquet file to the shared results folder. The coordinator merges a finished
+batch into the result store and one report. No broker: the queue is a single SQLite file.
+
+SQLite's WAL mode keeps readers and the writer apart but needs every process on the same host
+(its index lives in shared memory), so the default rollback journal is used on a network drive;
+pass journal_mode="wal" when all workers run on one machine.
+"""
+import os
+import socket
+import sqlite3
+import threading
+import time as _time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from app_state import log
+from pipeline import (Canceled, PipelineError, connect, analyze_stations, select_tables, select_models,
+                      auto_run_window, persist_run, write_run_report)
+
+# a job whose lease was not renewed for this long is handed to another worker
+LEASE_SECONDS = 600
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS batches (
+    batch TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    dt_from TEXT NOT NULL,
+    dt_to TEXT NOT NULL,
+    state TEXT,
+    serial_column TEXT
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    station TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dt_from TEXT NOT NULL,
+    dt_to TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result_path TEXT,
+    rows INTEGER,
+    error TEXT,
+    updated TEXT,
+    UNIQUE (batch, station, dt_from)
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, id);
+"""
+
+def split_window(dt_from, dt_to, days=0):
+    """(from, to) pieces of a window, `days` long each (0 keeps it whole), contiguous to the second."""
+    if not days:
+        return [(dt_from, dt_to)]
+    fmt = '%Y-%m-%d %H:%M:%S'
+    start, end = datetime.strptime(dt_from, fmt), datetime.strptime(dt_to, fmt)
+    pieces = []
+    while start <= end:
+        stop = min(start + timedelta(days=days) - timedelta(seconds=1), end)
+        pieces.append((start.strftime(fmt), stop.strftime(fmt)))
+        start = stop + timedelta(seconds=1)
+    return pieces
+
+class JobQueue:
+    """The queue file. Every change is one short transaction; claims take the write lock
+    (BEGIN IMMEDIATE) so two workers never get the same job."""
+    def __init__(self, path, journal_mode="delete"):
+        self.path = path
+        self.journal_mode = journal_mode
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # the journal mode is stored in the file, so it is set once here
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            conn.execute(f"PRAGMA journal_mode={journal_mode}")
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, immediate=False):
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+    def submit(self, batch, jobs, dt_from, dt_to, state=None, serial_column=""):
+        """Add a batch of (station, model, dt_from, dt_to) jobs; resubmitting a batch adds only new jobs."""
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect(immediate=True) as conn:
+            conn.execute("INSERT OR IGNORE INTO batches (batch, created, dt_from, dt_to, state, serial_column) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", (batch, now, dt_from, dt_to, state, serial_column))
+            conn.executemany("INSERT OR IGNORE INTO jobs (batch, station, model, dt_from, dt_to, updated) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", ((batch, *job, now) for job in jobs))
+        return len(jobs)
+
+    def claim(self, worker, lease_s=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """Oldest pending job, or a running one whose lease expired, as a dict; None when there is none.
+
+        An expired job that already had max_attempts attempts is marked failed instead of claimed:
+        its worker died without reaching fail() (killed, out of memory), and would die again.
+        """
+        now = _time.time()
+        with self._connect(immediate=True) as conn:
+            conn.execute("UPDATE jobs SET status = 'failed', lease_until = NULL, updated = ?, "
+                         "error = 'lease expired after ' || attempts || ' attempt(s), worker ' || worker || ' stopped' "
+                         "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                         (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), now, max_attempts))
+            row = conn.execute(
+                "SELECT j.id, j.batch, j.station, j.model, j.dt_from, j.dt_to, j.attempts, b.state, b.serial_column "
+                "FROM jobs j JOIN batches b ON b.batch = j.batch "
+                "WHERE j.status = 'pending' OR (j.status = 'running' AND j.lease_until < ?) ORDER BY j.id LIMIT 1",
+                (now,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET status = 'running', worker = ?, attempts = attempts + 1, lease_until = ?, "
+                         "updated = ? WHERE id = ?",
+                         (worker, now + lease_s, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), row[0]))
+        keys = ["id", "batch", "station", "model", "dt_from", "dt_to", "attempts", "state", "serial_column"]
+        job = dict(zip(keys, row))
+        job["attempts"] += 1
+        return job
+
+    def renew(self, job_id, worker, lease_s=LEASE_SECONDS):
+        """Extend the lease; False when the job is no longer this worker's (its lease expired and
+        another worker claimed it)."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                                (_time.time() + lease_s, job_id, worker)).rowcount == 1
+
+    def complete(self, job_id, worker, result_path, rows):
+        """Mark the job done; False (nothing changed) when it is no longer this worker's."""
+        with self._connect() as conn:
+            return conn.execute("UPDATE jobs SET status = 'done', result_path = ?, rows = ?, error = NULL, "
+                                "lease_until = NULL, updated = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                                (result_path, rows, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), job_id,
+                                 worker)).rowcount == 1
+
+    def fail(self, job_id, worker, error, attempts, max_attempts=MAX_ATTEMPTS):
+        """Record a failure; the job goes back to pending until it failed max_attempts times.
+        Returns the new status, None when the job is no longer this worker's."""
+        status = "failed" if attempts >= max_attempts else "pending"
+        with self._connect() as conn:
+            changed = conn.execute("UPDATE jobs SET status = ?, error = ?, lease_until = NULL, updated = ? "
+                                   "WHERE id = ? AND worker = ? AND status = 'running'",
+                                   (status, str(error), datetime.now().strftime("%Y-%m-%d %H:%M:%S"), job_id,
+                                    worker)).rowcount
+        return status if changed else None
+
+    def status(self, batch=None):
+        """{status: job count}, for one batch or all."""
+        sql = "SELECT status, COUNT(*) FROM jobs" + (" WHERE batch = ?" if batch else "") + " GROUP BY status"
+        with self._connect() as conn:
+            return dict(conn.execute(sql, (batch,) if batch else ()).fetchall())
+
+    def batch(self, batch):
+        with self._connect() as conn:
+            row = conn.execute("SELECT dt_from, dt_to, state, serial_column FROM batches WHERE batch = ?",
+                               (batch,)).fetchone()
+            jobs = conn.execute("SELECT station, dt_from, status, result_path, error FROM jobs WHERE batch = ? "
+                                "ORDER BY station, dt_from", (batch,)).fetchall()
+        if row is None:
+            return None
+        info = dict(zip(["dt_from", "dt_to", "state", "serial_column"], row))
+        info["jobs"] = [dict(zip(["station", "dt_from", "status", "result_path", "error"], job)) for job in jobs]
+        return info
+
+def default_results_dir(queue_path):
+    return os.path.join(os.path.dirname(os.path.abspath(queue_path)), "results")
+
+def submit_batch(queue, config, rules, dt_from=None, dt_to=None, split_days=0, emit=log):
+    """Queue one job per station (first model) and window piece. Tables are listed from the
+    database when the configuration selects none. Returns the batch id."""
+    if dt_from is None or dt_to is None:
+        dt_from, dt_to = auto_run_window(config)
+    stations = config.get("selected_tables")
+    if not stations:
+        stations = select_tables(connect(config, emit), config, emit)
+    selected = select_models(rules, stations)
+    if not selected:
+        raise PipelineError("No stations with models to queue")
+    batch = datetime.now().strftime("%Y%m%d%H%M%S")
+    state = config.get("state", "Auto") if config.get("apply_state", True) else None
+    jobs = [(station, model, start, end) for station, model in selected
+            for start, end in split_window(dt_from, dt_to, split_days)]
+    queue.submit(batch, jobs, dt_from, dt_to, state, config.get("serial_column", ""))
+    emit(f"Queued batch {batch}: {len(jobs)} job(s) for {len(selected)} station(s), {dt_from} to {dt_to}")
+    return batch
+
+def report_columns(df, serial_column=""):
+    """Retrieved columns a merged report needs: window, result, state, model and the serial."""
+    from retrieval import BASE_COLUMNS
+    from lineage import SERIAL_CANDIDATES
+    keep = set(BASE_COLUMNS) | set(SERIAL_CANDIDATES) | ({serial_column} if serial_column else set())
+    return [c for c in df.columns if c in keep]
+
+def run_job(job, engine, rules, results_dir, budget_mb=0, emit=log, should_stop=None):
+    """Retrieve and analyze one job; writes <results_dir>/<batch>/job_<id>_<attempt>.parquet and returns
+    (path relative to results_dir, rows). Unlike the auto-run, a failed retrieval raises, so the
+    job is retried instead of reported empty."""
+    from retrieval import fetch_station_table, memory_budget_bytes, station_keep_columns
+    station = job["station"]
+    serial_column = job["serial_column"] or ""
+    df, _ = fetch_station_table(engine, station, job["state"], job["dt_from"], job["dt_to"],
+                                memory_budget_bytes(budget_mb), station_keep_columns(rules, station, serial_column),
+                                emit=emit, project=True)
+    emit(f"Retrieved {len(df)} rows from {job['dt_from']} to {job['dt_to']}")
+    results = analyze_stations({station: df}, rules, [(station, job["model"])], emit, should_stop=should_stop,
+                               all_models=True)
+    if station in results:
+        out = df[report_columns(df, job["serial_column"])].join(results[station])
+    else:
+        out = df[report_columns(df, job["serial_column"])]
+    # one file per attempt: a worker that lost its lease never overwrites the result that counts
+    rel_path = os.path.join(job["batch"], f"job_{job['id']}_{job['attempts']}.parquet")
+    path = os.path.join(results_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    out.to_parquet(tmp)
+    os.replace(tmp, path)
+    return rel_path, len(out)
+
+class _Heartbeat(threading.Thread):
+    """Renews a job's lease every third of its length while the job runs; sets `lost` when the
+    job was handed to another worker, which stops the job at its next cancel check."""
+    def __init__(self, queue, job_id, worker, lease_s, emit=log):
+        super().__init__(daemon=True)
+        self.queue = queue
+        self.job_id = job_id
+        self.worker = worker
+        self.lease_s = lease_s
+        self.emit = emit
+        self.lost = threading.Event()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.lease_s / 3):
+            try:
+                if not self.queue.renew(self.job_id, self.worker, self.lease_s):
+                    self.lost.set()
+                    return
+            except sqlite3.Error as e:
+                # a busy or briefly unreachable queue file; the lease has two more chances
+                self.emit(f"Lease renewal failed: {e}")
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+def work(queue, config, rules, results_dir, worker=None, lease_s=None, idle_s=0, emit=log, should_stop=None):
+    """Claim and run jobs until the queue has had none for idle_s seconds (0: until it is empty).
+
+    lease_s defaults to job_lease_seconds of the configuration; the lease is renewed while a job
+    runs, so it only needs to outlast a stalled worker. Returns the number of jobs done.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    lease_s = lease_s or config.get("job_lease_seconds", LEASE_SECONDS) or LEASE_SECONDS
+    engine = connect(config, emit)
+    budget_mb = config.get("memory_budget_mb", 0)
+    done = 0
+    idle_since = None
+    while True:
+        if should_stop is not None and should_stop():
+            raise Canceled()
+        job = queue.claim(worker, lease_s)
+        if job is None:
+            idle_since = idle_since or _time.monotonic()
+            if _time.monotonic() - idle_since >= idle_s:
+                break
+            _time.sleep(min(5, idle_s))
+            continue
+        idle_since = None
+        tagged = lambda msg, job=job: emit(f"[job {job['id']} {job['station']}] {msg}")
+        heartbeat = _Heartbeat(queue, job["id"], worker, lease_s, tagged)
+        heartbeat.start()
+        job_stop = lambda: heartbeat.lost.is_set() or (should_stop is not None and should_stop())
+        try:
+            rel_path, rows = run_job(job, engine, rules, results_dir, budget_mb, tagged, job_stop)
+        except Canceled:
+            heartbeat.stop()
+            if heartbeat.lost.is_set():
+                tagged("Lease lost to another worker, job abandoned")
+                continue
+            queue.fail(job["id"], worker, "canceled", 0)
+            raise
+        except Exception as e:
+            heartbeat.stop()
+            status = queue.fail(job["id"], worker, e, job["attempts"])
+            tagged(f"Failed ({status or 'taken over'} after {job['attempts']} attempt(s)): {e}")
+            continue
+        heartbeat.stop()
+        if not queue.complete(job["id"], worker, rel_path, rows):
+            tagged("Lease lost to another worker, result left to it")
+            continue
+        done += 1
+        tagged(f"Done: {rows} rows")
+    emit(f"Worker {worker} finished: {done} job(s) done")
+    return done
+
+def merge_batch(queue, batch, results_dir, stations=None):
+    """Run dict (see pipeline.run_auto) of a finished batch: the job results concatenated per station
+    in window order. Raises PipelineError while jobs are pending or running."""
+    import pandas as pd
+    from data_utils import compact_dataframe, window_meta
+    info = queue.batch(batch)
+    if info is None:
+        raise PipelineError(f"Unknown batch {batch}")
+    open_jobs = [j for j in info["jobs"] if j["status"] in ("pending", "running")]
+    if open_jobs:
+        raise PipelineError(f"Batch {batch} has {len(open_jobs)} unfinished job(s)")
+    parts = {}
+    for job in info["jobs"]:
+        if job["status"] == "done":
+            parts.setdefault(job["station"], []).append(pd.read_parquet(os.path.join(results_dir, job["result_path"])))
+        else:
+            parts.setdefault(job["station"], [])
+    retrieved = {}
+    results = {}
+    for station, frames in parts.items():
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        if "Prediction" in df.columns:
+            # the job files hold the report columns followed by the result columns of every rule
+            result_cols = [c for c in df.columns if c not in report_columns(df, info["serial_column"] or "")]
+            results[station] = df[result_cols]
+            df = df.drop(columns=result_cols)
+        # categories differ between the job files, compact once more after the concat
+        retrieved[station] = compact_dataframe(df)[0]
+    return {"engine": None, "database": None, "stations": list(stations or parts), "state": info["state"],
+            "window": (info["dt_from"], info["dt_to"]), "serial_column": info["serial_column"] or "",
+            "retrieved": retrieved, "metas": {s: window_meta(df) for s, df in retrieved.items()},
+            "results": results, "report_path": None,
+            "failed": [(j["station"], j["dt_from"], j["error"]) for j in info["jobs"] if j["status"] == "failed"]}
+
+def report_batch(queue, batch, config, troubleshooting=None, results_dir=None, wait_s=0, emit=log, output_dir=None):
+    """Coordinator: wait up to wait_s seconds for the batch, merge it, persist it to the result
+    store and write one report. Returns the report path."""
+    results_dir = results_dir or default_results_dir(queue.path)
+    deadline = _time.monotonic() + wait_s
+    while True:
+        counts = queue.status(batch)
+        if not counts.get("pending") and not counts.get("running"):
+            break
+        if _time.monotonic() >= deadline:
+            raise PipelineError(f"Batch {batch} is not finished: {counts}")
+        _time.sleep(10)
+    run = merge_batch(queue, batch, results_dir)
+    for station, dt_from, error in run["failed"]:
+        emit(f"Job {station} from {dt_from} failed, its rows are missing from the report: {error}")
+    persist_run(run, config, emit)
+    return write_run_report(run, config, troubleshooting, emit, output_dir=output_dir)
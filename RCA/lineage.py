@@ -0,0 +1,93 @@
+import pandas as pd
+
+# Tried in order when app_config.json does not name the serial column
+SERIAL_CANDIDATES = ["Serial", "Serial_No", "Serial_Number", "SerialNumber", "SN", "Barcode", "Unit_ID", "UnitID"]
+
+def detect_serial_column(dfs, configured=""):
+    """Configured serial column if any table has it, else the first known candidate found."""
+    candidates = [configured] if configured else SERIAL_CANDIDATES
+    for cand in candidates:
+        if any(df is not None and cand in df.columns for df in dfs.values()):
+            return cand
+    return None
+
+class LineageIndex:
+    """Cross-station history of every unit, keyed by serial number.
+
+    passes: one row per test pass (Serial index, Station, Date_Time, NG, Seq) in time order.
+    units: one row per serial with pass count, first/last seen, first failing station and
+    whether every station passed at the first attempt.
+    """
+    def __init__(self, passes, serial_column):
+        self.serial_column = serial_column
+        self.passes = passes
+        first = passes.drop_duplicates(["Serial", "Station"], keep="first")
+        self.station_fpy = 1.0 - first.groupby("Station", observed=True)["NG"].mean()
+
+        g = passes.groupby("Serial", sort=False)
+        units = pd.DataFrame({
+            "passes": g.size(),
+            "first_seen": g["Date_Time"].min(),
+            "last_seen": g["Date_Time"].max(),
+            "failed": g["NG"].any(),
+        })
+        units["first_pass_ok"] = ~first.groupby("Serial", sort=False)["NG"].any().reindex(units.index, fill_value=False)
+        first_fail = passes.loc[passes["NG"]].drop_duplicates("Serial").set_index("Serial")["Station"]
+        units["first_fail_station"] = first_fail.reindex(units.index).astype(object)
+        self.units = units
+        self.passes = passes.set_index("Serial")
+
+    def unit_history(self, serial):
+        if serial not in self.units.index:
+            return self.passes.iloc[0:0]
+        return self.passes.loc[[serial]]
+
+    def kpis(self):
+        total = len(self.units)
+        ng = int(self.units["failed"].sum())
+        return {
+            "units": total,
+            "ok_units": total - ng,
+            "ng_units": ng,
+            "ng_perc": (ng / total * 100) if total else 0.0,
+            "fpy": (self.units["first_pass_ok"].mean() * 100) if total else 0.0,
+            "rty": (self.station_fpy.prod() * 100) if len(self.station_fpy) else 0.0,
+            "station_fpy": (self.station_fpy * 100).to_dict(),
+        }
+
+    def ng_units_by_time(self, freq):
+        """Units bucketed by first appearance, with the count that failed anywhere."""
+        units = self.units.dropna(subset=["first_seen"]).set_index("first_seen")
+        total = units.resample(freq).size()
+        ng = units.loc[units["failed"]].resample(freq).size().reindex(total.index, fill_value=0)
+        return total, ng
+
+def build_lineage_index(dfs, result_series, serial_column=""):
+    """Build a LineageIndex over all retrieved stations, None when no serial column is available.
+
+    result_series(station) must return the normalized Result column of that station.
+    """
+    serial_col = detect_serial_column(dfs, serial_column)
+    if serial_col is None:
+        return None
+    stations = list(dfs)
+    parts = []
+    for station, df in dfs.items():
+        if df is None or df.empty or serial_col not in df.columns:
+            continue
+        serial = df[serial_col].astype(str).str.strip()
+        part = pd.DataFrame({
+            "Serial": serial,
+            "Station": pd.Categorical([station] * len(df), categories=stations),
+            "Date_Time": df["Date_Time"] if "Date_Time" in df.columns else pd.NaT,
+            "NG": (result_series(station) == "NG").to_numpy(),
+        }, index=df.index)
+        valid = df[serial_col].notna() & (serial != "")
+        parts.append(part.loc[valid])
+    if not parts:
+        return None
+    passes = pd.concat(parts, ignore_index=True)
+    passes["Date_Time"] = pd.to_datetime(passes["Date_Time"])
+    passes = passes.sort_values(["Serial", "Date_Time", "Station"], kind="mergesort").reset_index(drop=True)
+    passes["Seq"] = passes.groupby("Serial", sort=False).cumcount()
+    return LineageIndex(passes, serial_col)
@@ -1,30 +1,37 @@
 import json
-from PyQt5.QtWidgets import QMessageBox
 import sys
 from app_state import log
 
-def load_rules():
+def _message(kind, title, text):
+    # message boxes only under the GUI; the headless pipeline gets the log entry alone
+    if "PyQt5.QtWidgets" not in sys.modules:
+        return
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    if QApplication.instance() is not None:
+        getattr(QMessageBox, kind)(None, title, text)
+
+def load_rules(path="JSON_Files/rules.json"):
     try:
-        with open("JSON_Files/rules.json", "r") as f:
+        with open(path, "r") as f:
             rules = json.load(f)
             log(f"Successfully loaded rules.json with {len(rules)} stations")
             return rules
     except FileNotFoundError:
         log("rules.json not found", "ERROR")
-        QMessageBox.critical(None, "Error", "rules.json not found")
+        _message("critical", "Error", "rules.json not found")
         sys.exit(1)
     except json.JSONDecodeError as e:
         log(f"Failed to parse rules.json: {e}", "ERROR")
-        QMessageBox.critical(None, "Error", f"Invalid JSON in rules.json: {e}")
+        _message("critical", "Error", f"Invalid JSON in rules.json: {e}")
         sys.exit(1)
     except Exception as e:
         log(f"Failed to load rules.json: {e}", "ERROR")
-        QMessageBox.critical(None, "Error", f"Failed to load rules.json: {e}")
+        _message("critical", "Error", f"Failed to load rules.json: {e}")
         sys.exit(1)
 
-def load_troubleshooting():
+def load_troubleshooting(path="JSON_Files/troubleshootings.json"):
     try:
-        with open("JSON_Files/troubleshootings.json", "r") as f:
+        with open(path, "r") as f:
             troubleshooting = json.load(f)
             if not isinstance(troubleshooting, dict):
                 raise ValueError("troubleshootings.json must be a dictionary")
@@ -43,17 +50,17 @@ def load_troubleshooting():
             return troubleshooting
     except FileNotFoundError:
         log("troubleshootings.json not found, using empty troubleshooting data", "WARN")
-        QMessageBox.warning(None, "Warning", "troubleshootings.json not found, no troubleshooting methods available")
+        _message("warning", "Warning", "troubleshootings.json not found, no troubleshooting methods available")
         return {}
     except json.JSONDecodeError as e:
         log(f"Failed to parse troubleshootings.json: {e}", "ERROR")
-        QMessageBox.critical(None, "Error", f"Invalid JSON in troubleshootings.json: {e}")
+        _message("critical", "Error", f"Invalid JSON in troubleshootings.json: {e}")
         return {}
     except ValueError as e:
         log(f"Invalid structure in troubleshootings.json: {e}", "ERROR")
-        QMessageBox.critical(None, "Error", f"Invalid structure in troubleshootings.json: {e}")
+        _message("critical", "Error", f"Invalid structure in troubleshootings.json: {e}")
         return {}
     except Exception as e:
         log(f"Failed to load troubleshootings.json: {e}", "ERROR")
-        QMessageBox.critical(None, "Error", f"Failed to load troubleshootings.json: {e}")
+        _message("critical", "Error", f"Failed to load troubleshootings.json: {e}")
         return {}
\ No newline at end of file
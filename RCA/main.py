@@ -1,28 +1,10 @@
 import sys
 import os
 import json
-import traceback
-from datetime import datetime, timedelta, date, time
-from functools import partial
-import itertools
-import matplotlib.colors as mcolors
-import base64
-from io import BytesIO
-import webbrowser
-import numpy as np
-import pandas as pd
-import platform
 
+# pandas, Matplotlib and SQLAlchemy are imported where they are used, after the window shows
 from PyQt5.QtWidgets import QApplication, QMessageBox
-from PyQt5.QtCore import QThread, QDateTime, QObject, QTime, QDate, QTimer
-from PyQt5.QtGui import QColor, QPixmap
-
-from sqlalchemy import create_engine, inspect, text
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from PyQt5.QtCore import QTimer
 
 from app_state import AppState, log
 from loaders import load_rules, load_troubleshooting
@@ -0,0 +1,659 @@
+"""Auto-run pipeline without Qt: connect, retrieve, analyze, persist and write the HTML report.
+
+The GUI workers call these steps, and a scheduler can run the same auto-run headless:
+
+    python -m pipeline autorun --config JSON_Files/app_config.json
+
+Every step takes its inputs explicitly (engine, frames, rules, config) and reports through an
+emit callable; nothing here reads or writes AppState. pandas, SQLAlchemy and Matplotlib are
+imported by the steps that use them.
+"""
+import os
+import sys
+import json
+import base64
+import argparse
+from datetime import datetime, timedelta, time
+from app_state import log, overall_window
+
+CONFIG_PATH = "JSON_Files/app_config.json"
+RULES_PATH = "JSON_Files/rules.json"
+TROUBLESHOOTING_PATH = "JSON_Files/troubleshootings.json"
+LOGO_PATH = os.path.join("src", "Valeo_Logo.svg.png")
+LOGO_URL = 'https://upload.wikimedia.org/wikipedia/commons/thumb/2/2b/Valeo_Logo.svg/2560px-Valeo_Logo.svg.png'
+
+class PipelineError(Exception):
+    """A run that cannot go on: incomplete configuration, no connection, nothing to analyze."""
+
+class Canceled(Exception):
+    pass
+
+def _check_stop(should_stop):
+    if should_stop is not None and should_stop():
+        raise Canceled()
+
+def auto_run_window(config, today=None):
+    """Retrieval window of an auto-run: `every` days of operation (08:00:00 to 07:59:59) ending at
+    date_setup, or today when it is not set."""
+    every = config.get("every", 7)
+    date_str = config.get("date_setup")
+    end_date = datetime.strptime(date_str, "%Y/%m/%d").date() if date_str else (today or datetime.now().date())
+    from_date = end_date - timedelta(days=every)
+    dt_from = datetime.combine(from_date, time(8, 0, 0)).strftime('%Y-%m-%d %H:%M:%S') #standard start time of a operation day
+    dt_to = datetime.combine(end_date, time(7, 59, 59)).strftime('%Y-%m-%d %H:%M:%S') #standard end time of a operation day
+    return dt_from, dt_to
+
+def connect(config, emit=log):
+    from sqlalchemy import create_engine
+    host = config.get("host")
+    port = config.get("port") or "3306"
+    user = config.get("user")
+    password = config.get("password")
+    db = config.get("database")
+    if not all([host, user, db]):
+        raise PipelineError("Incomplete configuration for auto-run")
+    try:
+        engine = create_engine(f"mysql+pymysql://{user}:{password}@{host}:{port}/{db}")
+    except Exception as e:
+        raise PipelineError(f"Auto-connect failed: {e}")
+    emit(f"Auto-connected to database {db} on {host}:{port}")
+    return engine
+
+def select_tables(engine, config, emit=log):
+    """Configured tables, or every table of the database when none are configured."""
+    from sqlalchemy import inspect
+    try:
+        tables = inspect(engine).get_table_names()
+    except Exception as e:
+        raise PipelineError(f"Error refreshing tables in auto-run: {e}")
+    selected_tables = config.get("selected_tables", tables)
+    emit(f"Auto-selected tables: {selected_tables}")
+    return selected_tables
+
+def retrieve_stations(engine, tables, state, dt_from, dt_to, rules, serial_column="", budget_mb=0, emit=log,
+                      should_stop=None, project=False):
+    """Fetch every table within one memory budget. Returns (frames, window metadata) by table;
+    a table that fails is logged and kept empty. project selects only the columns the rules and
+    reports use."""
+    import pandas as pd
+    from data_utils import ingest_retrieved_frame, format_bytes
+    from retrieval import fetch_station_table, memory_budget_bytes, station_keep_columns
+    budget = memory_budget_bytes(budget_mb)
+    used = 0
+    dfs = {}
+    metas = {}
+    for table in tables:
+        _check_stop(should_stop)
+        try:
+            df, meta = fetch_station_table(engine, table, state, dt_from, dt_to, max(budget - used, 0),
+                                           keep_columns=station_keep_columns(rules, table, serial_column),
+                                           emit=emit, project=project)
+            emit(f"Auto-retrieved {len(df)} rows from {table}")
+        except Exception as e:
+            emit(f"Retrieve failed for {table} in auto-run: {e}")
+            df, meta = ingest_retrieved_frame(pd.DataFrame())
+        used += meta['mem_after']
+        emit(f"Compacted {table}: {format_bytes(meta['mem_before'])} -> {format_bytes(meta['mem_after'])}")
+        dfs[table] = df
+        metas[table] = meta
+    return dfs, metas
+
+def select_models(rules, stations):
+    """(station, first model) of every station that has rules."""
+    selected = []
+    for station in stations:
+        if station in rules:
+            models = list(rules[station].get("models", {}).keys())
+            if models:
+                selected.append((station, models[0]))
+    return selected
+
+def station_rule(rules, station, model):
+    try:
+        rule_list = rules[station]["models"][model]["rules"]
+    except KeyError:
+        return None
+    if isinstance(rule_list, list):
+        return rule_list[0] if rule_list else None
+    return rule_list
+
+def station_rules(rules, station, model, all_models=True):
+    """(model, index, rule) of every rule of every model of a station (only of the given model
+    without all_models), the given model's first rule first."""
+    found = []
+    for name, entry in rules[station].get("models", {}).items():
+        if not all_models and name != model:
+            continue
+        rule_list = entry.get("rules") if isinstance(entry, dict) else None
+        if rule_list is None:
+            continue
+        for i, rule in enumerate(rule_list if isinstance(rule_list, list) else [rule_list]):
+            found.append((name, i, rule))
+    found.sort(key=lambda item: (item[0], item[1]) != (model, 0))
+    return found
+
+def result_columns(model=None, index=0):
+    """Prediction/Root_Cause/Match_Path column names of a model's rule: plain for the selected
+    model's first rule (model None), suffixed with [model] or [model #n] for the others."""
+    names = ["Prediction", "Root_Cause", "Match_Path"]
+    if model is None:
+        return names
+    tag = model if index == 0 else f"{model} #{index + 1}"
+    return [f"{name} [{tag}]" for name in names]
+
+def analyze_stations(retrieved, rules, selected, emit=log, progress=None, should_stop=None, all_models=False):
+    """Apply every rule of the selected model of each (station, selected model) to its retrieved
+    rows; with all_models (the auto-run), every rule of every model of the station.
+
+    Returns {station: result frame sharing the retrieved index}: Prediction/Root_Cause/Match_Path
+    of the selected model's first rule, which reports and the result store use, then the same
+    columns of each other rule (result_columns). The feature columns of a station are encoded
+    once and shared by all its rules. progress(percent) is called per rule; raises Canceled
+    when should_stop() turns true.
+    """
+    import pandas as pd
+    from analysis_utils import collect_rule_features, encode_features, evaluate_rule
+    work = []
+    for station, model in selected:
+        df = retrieved.get(station)
+        if station_rule(rules, station, model) is None or df is None or df.empty:
+            continue
+        work.append((station, model, df, station_rules(rules, station, model, all_models)))
+    total = sum(len(df) * len(found) for _, _, df, found in work)
+    results = {}
+    done = 0
+    for station, model, df, found in work:
+        _check_stop(should_stop)
+        emit(f"Analyzing station: {station}, model: {model}, rows: {len(df)}"
+             + (f", rules: {len(found)}" + (" (all models)" if all_models else "") if len(found) > 1 else ""))
+        encoded = encode_features(df, collect_rule_features([rule for _, _, rule in found]))
+        columns = {}
+        for name, i, rule in found:
+            _check_stop(should_stop)
+            names = result_columns(None if (name, i) == (model, 0) else name, i)
+            columns.update(zip(names, evaluate_rule(encoded, len(df), rule)))
+            done += len(df)
+            if progress is not None:
+                progress(done * 100 // total if total > 0 else 0)
+        results[station] = pd.DataFrame(columns, index=df.index)
+        emit(f"Completed analysis for {station}")
+    return results
+
+def report_name(filename="", title="", include_week=True, week_no=None):
+    """Default file name and page title of a report, with the week number when enabled."""
+    filename = filename.strip() or "Report"
+    title = title.strip() or "Report Title"
+    if include_week:
+        return f"{filename}_Week_{week_no}.html", f"{title} - Week {week_no}"
+    return f"{filename}.html", title
+
+def embedded_logo(path=LOGO_PATH, emit=log):
+    """Local logo as a data URI so the report works offline; the public URL when it is missing."""
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                logo_data = base64.b64encode(f.read()).decode('utf-8')
+            return f'data:image/png;base64,{logo_data}'
+        except Exception as e:
+            emit(f"Failed to encode local logo: {e}")
+    return LOGO_URL
+
+def chart_cache(cache_dir="", cache_mb=200, emit=log):
+    """ChartCache of the PNG charts, None when disabled (cache_mb 0) or unavailable."""
+    if not cache_mb:
+        return None
+    from chart_cache import ChartCache
+    from report_charts import chart_style_key
+    try:
+        return ChartCache(cache_dir or None, cache_mb * 1024 * 1024, chart_style_key())
+    except OSError as e:
+        emit(f"Chart cache unavailable, rendering all charts: {e}")
+        return None
+
+class _ProgressWriter:
+    """Text file wrapper reporting the characters written and raising Canceled when asked to stop."""
+    STEP = 256 * 1024
+
+    def __init__(self, f, written=None, should_stop=None):
+        self.f = f
+        self.on_written = written
+        self.should_stop = should_stop
+        self.written = 0
+        self.reported = 0
+
+    def write(self, text):
+        _check_stop(self.should_stop)
+        self.f.write(text)
+        # the markup is ASCII apart from labels, so characters stand in for bytes
+        self.written += len(text)
+        if self.on_written is not None and self.written - self.reported >= self.STEP:
+            self.reported = self.written
+            self.on_written(self.written)
+
+def _report_images(specs, chart_mode, workers, cache, emit, progress, should_stop):
+    if chart_mode == "svg":
+        from report_svg import render_chart_svg
+        images = (render_chart_svg(spec) for spec in specs)
+    else:
+        from report_charts import iter_render_charts, png_data_uri
+        # base64 is encoded per chart as it is written, not for the whole page up front
+        images = (png_data_uri(png) for png in iter_render_charts(specs, workers, emit=emit, cache=cache))
+    if progress is not None:
+        progress(0, len(specs))
+    for done, image in enumerate(images, 1):
+        if should_stop is not None and should_stop():
+            images.close()
+            raise Canceled()
+        if progress is not None:
+            progress(done, len(specs))
+        yield image
+
+def write_report(path, model, title, logo_src, chart_mode="png", workers=0, cache=None, emit=log,
+                 progress=None, written=None, should_stop=None):
+    """Render the charts of a ReportModel and stream the HTML report to path.
+
+    progress(done, total) is called per chart and written(chars) while the page is written.
+    The page goes to <path>.part first, so a failed or canceled report never replaces a previous one.
+    """
+    from report_charts import chart_specs, chart_workers
+    from report_html import write_report_html
+    t0 = datetime.now()
+    specs = chart_specs(model)
+    emit(f"Generating HTML report: {path} ({len(specs)} charts, "
+         f"{'svg' if chart_mode == 'svg' else f'{chart_workers(workers)} worker(s)'})")
+    tmp_path = path + ".part"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            out = _ProgressWriter(f, written, should_stop)
+            write_report_html(out, model, title, logo_src, specs,
+                              _report_images(specs, chart_mode, workers, cache, emit, progress, should_stop))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if written is not None:
+        written(out.written)
+    emit(f"Wrote {len(specs)} charts and {len(model.troubleshooting_rows)} troubleshooting rows "
+         f"({os.path.getsize(path) / 1024:.0f} KB) in {(datetime.now() - t0).total_seconds():.2f}s")
+    return path
+
+def save_config(config, path):
+    """Write the configuration atomically, a crash never leaves a truncated app_config.json."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(config, f, indent=4)
+    os.replace(tmp_path, path)
+
+def set_date_setup(config_path, date_setup):
+    """Store date_setup in the configuration file atomically, keeping the other keys as they are on disk."""
+    with open(config_path, "r") as f:
+        config = json.load(f)
+    config["date_setup"] = date_setup
+    save_config(config, config_path)
+
+def advance_date_setup(config, config_path, emit=log):
+    """Move date_setup forward by `every` days so the next auto-run takes the next window."""
+    date_str = config.get("date_setup")
+    if not date_str:
+        return
+    end_date = datetime.strptime(date_str, "%Y/%m/%d").date()
+    config["date_setup"] = (end_date + timedelta(days=config.get("every", 7))).strftime("%Y/%m/%d")
+    set_date_setup(config_path, config["date_setup"])
+    emit(f"Updated config date to {config['date_setup']}")
+
+def retrieve_window(engine, config, rules, stations, window, emit=log, should_stop=None, budget_mb=None,
+                    project=False):
+    """Retrieve one (dt_from, dt_to) window of the stations on an existing engine.
+
+    budget_mb defaults to the configuration; concurrent windows pass their share. Returns the run dict described in run_auto, results None.
+    """
+    dt_from, dt_to = window
+    state = config.get("state", "Auto") if config.get("apply_state", True) else None
+    emit(f"Auto-retrieving data: state={state if state else 'None'}, from={dt_from}, to={dt_to}")
+
+    serial_column = config.get("serial_column", "")
+    retrieved, metas = retrieve_stations(engine, stations, state, dt_from, dt_to, rules, serial_column,
+                                         config.get("memory_budget_mb", 0) if budget_mb is None else budget_mb,
+                                         emit, should_stop, project)
+    emit("Auto-data retrieval completed.")
+    return {"engine": engine, "database": config.get("database"), "stations": stations, "state": state,
+            "window": window, "serial_column": serial_column, "retrieved": retrieved, "metas": metas, "results": None,
+            "report_path": None}
+
+def analyze_run(run, rules, emit=log, should_stop=None):
+    """Analyze the retrieved frames of a run with every model of each station, the first one giving
+    the report columns; sets run["results"]."""
+    selected = select_models(rules, run["stations"])
+    if not selected:
+        raise PipelineError("No stations with models for auto-analysis")
+    emit("Starting auto-analysis...")
+    run["results"] = analyze_stations(run["retrieved"], rules, selected, emit, should_stop=should_stop, all_models=True)
+    emit("Auto-analysis completed.")
+    return run
+
+def run_window(engine, config, rules, stations, window, emit=log, should_stop=None, budget_mb=None, project=False):
+    """Retrieve and analyze one window (retrieve_window, then analyze_run)."""
+    run = retrieve_window(engine, config, rules, stations, window, emit, should_stop, budget_mb, project)
+    return analyze_run(run, rules, emit, should_stop)
+
+def persist_run(run, config, emit=log):
+    """Write the results of a run to the result store unless it is disabled in the configuration."""
+    from result_store import store_analysis_results
+    if config.get("result_store", True):
+        store_analysis_results(run["retrieved"], run["results"], config.get("result_store_dir") or None,
+                               run["serial_column"], emit=emit)
+
+def run_checkpointed(engine, config, rules, window, emit=log, should_stop=None, budget_mb=None, stations=None,
+                     persist=False):
+    """Retrieve and analyze one window like run_window, resuming after the last stage a previous
+    attempt checkpointed (checkpoint.RunCheckpoint). With persist, fresh results are written to the
+    result store before they are checkpointed. The run dict carries the checkpoint, which the
+    caller clears once the window is done (finish_run)."""
+    from checkpoint import RunCheckpoint
+    checkpoint = RunCheckpoint.open(config, rules, window, emit)
+    run = checkpoint.load(engine) if checkpoint is not None else None
+    if run is None:
+        if stations is None:
+            stations = select_tables(engine, config, emit)
+        run = retrieve_window(engine, config, rules, stations, window, emit, should_stop, budget_mb)
+        if checkpoint is not None:
+            checkpoint.save_retrieved(run)
+    if run["results"] is None:
+        analyze_run(run, rules, emit, should_stop)
+        if persist:
+            persist_run(run, config, emit)
+        if checkpoint is not None:
+            checkpoint.save_results(run["results"])
+    run["checkpoint"] = checkpoint
+    return run
+
+def run_auto(config, rules, troubleshooting=None, config_path=CONFIG_PATH, emit=log, should_stop=None,
+             report=True, output_dir=None):
+    """One auto-run: retrieve the configured window, analyze, persist, write the report, advance
+    date_setup.
+
+    Retrieval and analysis are checkpointed (checkpoint.RunCheckpoint), so a run that failed is
+    resumed after its last completed stage. With report False the caller writes the report and
+    then calls finish_run(). Returns a dict with the engine, stations, state, requested window,
+    serial column, frames, window metadata, analysis results, checkpoint and the report path.
+    config_path None leaves date_setup unchanged.
+    """
+    window = auto_run_window(config)
+    engine = connect(config, emit)
+    run = run_checkpointed(engine, config, rules, window, emit, should_stop, persist=True)
+
+    if report:
+        run["report_path"] = write_run_report(run, config, troubleshooting, emit, should_stop, output_dir)
+        finish_run(run, config, config_path, emit)
+    return run
+
+def finish_run(run, config, config_path=CONFIG_PATH, emit=log):
+    """Last step of an auto-run once its report is written: advance date_setup and drop the checkpoint."""
+    # Update the date setup after auto-run completed
+    if config_path:
+        advance_date_setup(config, config_path, emit)
+    if run.get("checkpoint") is not None:
+        run["checkpoint"].clear()
+
+def period_suffix(date_setup, every):
+    """Report name suffix of a window; windows shorter than a week would overwrite each other's weekly report."""
+    return f"_{date_setup.replace('/', '-')}" if every < 7 else ""
+
+def period_windows(until, every=7, periods=12):
+    """(date_setup, (dt_from, dt_to)) of `periods` consecutive auto-run windows, the last ending at until."""
+    end_date = datetime.strptime(until, "%Y/%m/%d").date()
+    windows = []
+    for k in range(periods - 1, -1, -1):
+        date_setup = (end_date - timedelta(days=k * every)).strftime("%Y/%m/%d")
+        windows.append((date_setup, auto_run_window({"date_setup": date_setup, "every": every})))
+    return windows
+
+def split_periods(run, windows, every=7):
+    """Yield (date_setup, run) per window, each holding the rows and results of the union run inside it.
+
+    Rows are assigned to windows with one pass over Date_Time per station, not one filter per window.
+    """
+    import pandas as pd
+    from data_utils import window_meta, safe_to_datetime
+    start = pd.Timestamp(windows[0][1][0])
+    step = pd.Timedelta(days=every)
+    positions = {}
+    for station, df in run["retrieved"].items():
+        if df is None or df.empty or "Date_Time" not in df.columns:
+            positions[station] = {}
+            continue
+        dt = df["Date_Time"]
+        if not pd.api.types.is_datetime64_any_dtype(dt):
+            dt = safe_to_datetime(dt)
+        period = (dt - start) // step
+        positions[station] = {int(k): v for k, v in period.groupby(period.to_numpy()).indices.items()}
+    for k, (date_setup, window) in enumerate(windows):
+        retrieved = {}
+        results = {}
+        for station, df in run["retrieved"].items():
+            pos = positions[station].get(k, [])
+            retrieved[station] = df.iloc[pos]
+            if station in run["results"]:
+                results[station] = run["results"][station].iloc[pos]
+        yield date_setup, dict(run, window=window, retrieved=retrieved, results=results,
+                               metas={station: window_meta(df) for station, df in retrieved.items()})
+
+def run_periods(config, rules, troubleshooting=None, until=None, periods=12, emit=log, should_stop=None,
+                output_dir=None, store=False):
+    """Reports of `periods` consecutive windows from one retrieval and one analysis of their union.
+
+    until is the date_setup of the last window; by default the window the last auto-run reported
+    (date_setup minus `every`). Only the columns the rules and reports use are selected. date_setup
+    is not changed. Returns the report paths.
+    """
+    every = config.get("every", 7)
+    if not until:
+        date_str = config.get("date_setup")
+        last = datetime.strptime(date_str, "%Y/%m/%d").date() - timedelta(days=every) if date_str else datetime.now().date()
+        until = last.strftime("%Y/%m/%d")
+    windows = period_windows(until, every, periods)
+    engine = connect(config, emit)
+    stations = select_tables(engine, config, emit)
+    union = (windows[0][1][0], windows[-1][1][1])
+    emit(f"Retrieving {periods} period(s) at once for their reports")
+    run = run_window(engine, config, rules, stations, union, emit, should_stop, project=True)
+    if store:
+        persist_run(run, config, emit)
+    paths = []
+    for date_setup, period in split_periods(run, windows, every):
+        _check_stop(should_stop)
+        paths.append(write_run_report(period, config, troubleshooting, emit, should_stop, output_dir,
+                                      period_suffix(date_setup, every)))
+    return paths
+
+def run_report_model(run, troubleshooting=None, emit=log):
+    """ReportModel of a run_auto() result, with the unit lineage when a serial column is found."""
+    from data_utils import normalize_result
+    from lineage import build_lineage_index
+    from report_model import ReportModel
+    retrieved = run["retrieved"]
+    results = {station: normalize_result(df) for station, df in retrieved.items()}
+    try:
+        lineage = build_lineage_index(retrieved, results.get, run["serial_column"])
+    except Exception as e:
+        lineage = None
+        emit(f"Failed to build unit lineage index: {e}")
+    return ReportModel(run["stations"], retrieved, run["results"], troubleshooting, lineage, run["state"],
+                       overall_window(run["metas"]), results.get)
+
+def run_week(run, model):
+    """Week number of a run's report; a window without data is named after the window that was asked for."""
+    from report_model import report_week
+    return report_week(model.start if model.start is not None else datetime.strptime(run["window"][0], '%Y-%m-%d %H:%M:%S'))
+
+def write_run_report(run, config, troubleshooting=None, emit=log, should_stop=None, output_dir=None, suffix="",
+                     model=None):
+    """HTML report of a run_auto() result, named and placed from the configuration.
+
+    suffix is added to the file name, for runs that would otherwise share a week's name.
+    """
+    model = model or run_report_model(run, troubleshooting, emit)
+    filename, title = report_name(config.get("html_filename", ""), config.get("html_title", ""),
+                                  config.get("include_week_no", True), run_week(run, model))
+    if suffix:
+        filename = filename[:-len(".html")] + suffix + ".html"
+    path = os.path.join(output_dir or config.get("auto_save_path", "") or "", filename)
+    chart_mode = config.get("report_chart_mode", "png")
+    cache = chart_cache(config.get("chart_cache_dir", ""), config.get("chart_cache_mb", 200), emit) if chart_mode == "png" else None
+    write_report(path, model, title, embedded_logo(emit=emit), chart_mode, config.get("report_workers", 0), cache,
+                 emit, should_stop=should_stop)
+    emit(f"HTML report saved at {path}")
+    return path
+
+def main(argv=None):
+    from loaders import load_rules, load_troubleshooting
+    parser = argparse.ArgumentParser(prog="python -m pipeline", description="Run RCA without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    autorun = commands.add_parser("autorun", help="retrieve, analyze, persist and report the configured window")
+    autorun.add_argument("--config", default=CONFIG_PATH, help="app configuration (default: %(default)s)")
+    autorun.add_argument("--rules", default=RULES_PATH)
+    autorun.add_argument("--troubleshooting", default=TROUBLESHOOTING_PATH)
+    autorun.add_argument("--output-dir", help="report folder (default: auto_save_path of the configuration)")
+    autorun.add_argument("--no-report", action="store_true", help="skip the HTML report")
+    autorun.add_argument("--keep-date", action="store_true", help="do not advance date_setup in the configuration")
+    reports = commands.add_parser("reports", help="report past periods from one retrieval and analysis")
+    reports.add_argument("--config", default=CONFIG_PATH, help="app configuration (default: %(default)s)")
+    reports.add_argument("--rules", default=RULES_PATH)
+    reports.add_argument("--troubleshooting", default=TROUBLESHOOTING_PATH)
+    reports.add_argument("--output-dir", help="report folder (default: auto_save_path of the configuration)")
+    reports.add_argument("--periods", type=int, default=12, help="number of `every`-day periods (default: %(default)s)")
+    reports.add_argument("--until", help="date_setup (YYYY/MM/DD) of the last period (default: the last auto-run's)")
+    reports.add_argument("--store", action="store_true", help="also write the results to the result store")
+    schedule = commands.add_parser("schedule", help="run each window when due and backfill missed windows")
+    schedule.add_argument("--config", default=CONFIG_PATH, help="app configuration (default: %(default)s)")
+    schedule.add_argument("--rules", default=RULES_PATH)
+    schedule.add_argument("--troubleshooting", default=TROUBLESHOOTING_PATH)
+    schedule.add_argument("--output-dir", help="report folder (default: auto_save_path of the configuration)")
+    schedule.add_argument("--no-report", action="store_true", help="skip the HTML reports")
+    schedule.add_argument("--workers", type=int, default=0,
+                          help="windows backfilled in parallel (default: backfill_workers of the configuration)")
+    schedule.add_argument("--poll", type=int, default=300, help="seconds between checks for due windows")
+    schedule.add_argument("--once", action="store_true", help="run the due windows and exit")
+    queue = commands.add_parser("queue", help="spread station analysis over several machines")
+    queue_commands = queue.add_subparsers(dest="queue_command", required=True)
+    for name, help_text in [("submit", "queue one job per station and window piece"),
+                            ("work", "run queued jobs with this machine's database connection"),
+                            ("status", "job counts by status"),
+                            ("report", "merge a finished batch into the result store and one report")]:
+        sub = queue_commands.add_parser(name, help=help_text)
+        sub.add_argument("--config", default=CONFIG_PATH, help="app configuration (default: %(default)s)")
+        sub.add_argument("--rules", default=RULES_PATH)
+        sub.add_argument("--troubleshooting", default=TROUBLESHOOTING_PATH)
+        sub.add_argument("--queue", help="queue file (default: job_queue of the configuration)")
+        sub.add_argument("--results", help="shared results folder (default: results next to the queue file)")
+        sub.add_argument("--wal", action="store_true", help="WAL journal, only when every worker runs on this host")
+        sub.add_argument("--batch", help="batch id (status, report)")
+    queue_commands.choices["submit"].add_argument("--from", dest="dt_from", help="YYYY-MM-DD HH:MM:SS "
+                                                  "(default: the configured auto-run window)")
+    queue_commands.choices["submit"].add_argument("--to", dest="dt_to", help="YYYY-MM-DD HH:MM:SS")
+    queue_commands.choices["submit"].add_argument("--split-days", type=int, default=0,
+                                                  help="split each station's window into jobs of this many days")
+    queue_commands.choices["work"].add_argument("--idle", type=int, default=0,
+                                                help="seconds to wait for new jobs before exiting (default: exit when empty)")
+    queue_commands.choices["work"].add_argument("--lease", type=int, default=0,
+                                                help="job lease in seconds, renewed while a job runs "
+                                                     "(default: job_lease_seconds of the configuration)")
+    queue_commands.choices["report"].add_argument("--output-dir", help="report folder (default: auto_save_path)")
+    queue_commands.choices["report"].add_argument("--wait", type=int, default=0,
+                                                  help="seconds to wait for unfinished jobs")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.config, "r") as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        log(f"Failed to load {args.config}: {e}", "ERROR")
+        return 2
+    rules = load_rules(args.rules)
+    troubleshooting = load_troubleshooting(args.troubleshooting)
+    if args.command == "schedule":
+        from scheduler import serve
+        log(f"Scheduler started for {args.config}")
+        try:
+            serve(args.config, rules, troubleshooting, args.workers, args.poll, args.once,
+                  report=not args.no_report, output_dir=args.output_dir)
+        except KeyboardInterrupt:
+            log("Scheduler stopped")
+        return 0
+    if args.command == "queue":
+        return queue_main(args, config, rules, troubleshooting)
+    if args.command == "reports":
+        try:
+            paths = run_periods(config, rules, troubleshooting, args.until, args.periods,
+                                output_dir=args.output_dir, store=args.store)
+        except Exception as e:
+            log(f"Report backfill error: {e}", "ERROR")
+            return 1
+        log(f"Wrote {len(paths)} period report(s)")
+        return 0
+    log("Starting auto-run...")
+    try:
+        if config.get("targets"):
+            from fanout import run_targets
+            if run_targets(config, rules, troubleshooting, None if args.keep_date else args.config,
+                           report=not args.no_report, output_dir=args.output_dir)["failed"]:
+                return 1
+        else:
+            config_path = None if args.keep_date else args.config
+            run = run_auto(config, rules, troubleshooting, config_path, report=not args.no_report,
+                           output_dir=args.output_dir)
+            if args.no_report:
+                finish_run(run, config, config_path)
+    except PipelineError as e:
+        log(str(e), "ERROR")
+        return 1
+    except Exception as e:
+        log(f"Auto-run error: {e}", "ERROR")
+        return 1
+    log("Auto-run completed.")
+    return 0
+
+def queue_main(args, config, rules, troubleshooting):
+    """`queue` subcommands of main()."""
+    import job_queue
+    path = args.queue or config.get("job_queue", "")
+    if not path:
+        log("No queue file: pass --queue or set job_queue in the configuration", "ERROR")
+        return 2
+    results_dir = args.results or job_queue.default_results_dir(path)
+    try:
+        queue = job_queue.JobQueue(path, "wal" if args.wal else "delete")
+        if args.queue_command == "submit":
+            if bool(args.dt_from) != bool(args.dt_to):
+                log("Pass both --from and --to, or neither", "ERROR")
+                return 2
+            job_queue.submit_batch(queue, config, rules, args.dt_from, args.dt_to, args.split_days)
+        elif args.queue_command == "work":
+            job_queue.work(queue, config, rules, results_dir, lease_s=args.lease, idle_s=args.idle)
+        elif args.queue_command == "status":
+            log(f"Jobs{' of batch ' + args.batch if args.batch else ''}: {queue.status(args.batch)}")
+        else:
+            if not args.batch:
+                log("Pass the --batch to report", "ERROR")
+                return 2
+            job_queue.report_batch(queue, args.batch, config, troubleshooting, results_dir, args.wait,
+                                   output_dir=args.output_dir)
+    except PipelineError as e:
+        log(str(e), "ERROR")
+        return 1
+    except KeyboardInterrupt:
+        log("Queue command stopped")
+        return 1
+    except Exception as e:
+        log(f"Queue error: {e}", "ERROR")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    # run the imported module, so the exceptions raised by job_queue, scheduler and fanout are
+    # the classes main() catches
+    import pipeline
+    sys.exit(pipeline.main())
@@ -0,0 +1,200 @@
+from io import StringIO
+from html import escape
+from string import Template
+
+REPORT_CSS = [
+    'body { font-family: Helvetica, sans-serif; margin: 0; background-color: #f3f4f6; color: #111827; zoom: 75%; }',
+    '.header { background-color: #82e600; color: #414141; padding: 19px; text-align: center; }',
+    'h1 { margin: 0; font-size: 24px; font-weight: bold; }',
+    '.logo { float: right; width: 113px; height: 113px; object-fit: contain; margin: 8px; }',
+    'h2 { color: #111827; font-size: 18px; font-weight: 600; margin: 23px 0 11px; }',
+    'p { font-size: 12px; line-height: 1.7; margin: 9px 0; }',
+    '.container { max-width: 1050px; margin: 23px auto; padding: 23px; background-color: #ffffff; border-radius: 9px; box-shadow: 0 5px 12px rgba(0,0,0,0.1); overflow: hidden; }',
+    '.troubleshooting { width: 100%; font-size: 12px; border-collapse: collapse; text-align: center; margin: 19px 0; }',
+    '.troubleshooting th, .troubleshooting td { padding: 11px; border: 1px solid #d1d5db; vertical-align: top; }',
+    '.troubleshooting th { background-color: #e5e7eb; color: #111827; font-weight: bold; font-size: 12px; }',
+    '.troubleshooting td { font-size: 11px; }',
+    '.troubleshooting td:nth-child(3), .troubleshooting td:nth-child(4) { text-align: left; padding-left: 15px; }',
+    '.troubleshooting tr:nth-child(even) { background-color: #e6f3ff; }',
+    '.troubleshooting tr:nth-child(odd) { background-color: #ffffff; }',
+    '.troubleshooting tr:hover { background-color: #f9fafb; }',
+    '.troubleshooting ul { margin: 4px 0; padding-left: 15px; list-style-type: disc; }',
+    '.troubleshooting li { font-size: 11px; margin-bottom: 4px; color: #374151; line-height: 1.4; }',
+    '.image-container { text-align: center; margin: 23px 0; }',
+    '.grid-container { display: grid; grid-template-columns: repeat(3, 1fr); gap: 38px; margin: 45px 0; align-items: end; }',
+    '.summary-grid { display: grid; grid-template-columns: repeat(2, 1fr); gap: 19px; margin: 45px 0; align-items: end; }',
+    '.grid-item { text-align: center; display: flex; flex-direction: column; justify-content: flex-end; position: relative; }',
+    '.grid-item::before { content: ""; position: absolute; top: 0; left: 0; right: 0; bottom: 0; border: 0px solid #e2e8f0; border-radius: 6px; z-index: 0; }',
+    'img { max-width: 100%; height: auto; border: 2px solid #d1d5db; border-radius: 8px; box-shadow: 0 3px 6px rgba(0,0,0,0.1); position: relative; z-index: 1; }',
+    'svg.chart { max-width: 100%; height: auto; background-color: #ffffff; border: 2px solid #d1d5db; border-radius: 8px; box-shadow: 0 3px 6px rgba(0,0,0,0.1); position: relative; z-index: 1; }',
+    '.caption { font-size: 15px; color: #4b5563; font-style: italic; margin-top: 5px; font-weight: 500; position: relative; z-index: 1; }',
+    '.info-list { display: grid; grid-template-columns: auto 1fr; gap: 8px 15px; max-width: 450px; margin: 15px 0; font-size: 12px; border: 1px solid #d1d5db; padding: 11px; border-radius: 6px; background-color: #f8fafc; }',
+    '.info-list dt { font-weight: bold; text-align: right; color: #4b5563; }',
+    '.info-list dd { margin: 0; color: #111827; }',
+    '.kpi-container { display: grid; grid-template-columns: repeat(4, 1fr); gap: 15px; margin: 23px 0; }',
+    '.kpi-card { background-color: #f8fafc; padding: 15px; border-radius: 6px; text-align: center; box-shadow: 0 2px 3px rgba(0,0,0,0.1); }',
+    '.kpi-card h3 { font-size: 14px; margin-bottom: 8px; color: #4b5563; }',
+    '.kpi-card p { font-size: 18px; font-weight: bold; margin: 0; }',
+    '.blue { background-color: #6366f1; color: #f8fafc; }',
+    '.red { background-color: #ef4444; color: #f8fafc; }',
+    '.green { background-color: #82e600; color: #f8fafc; }',
+]
+
+# Static part of the page, joined once per process
+REPORT_HEAD = "\n".join(['<html>', '<head>', '<style>'] + REPORT_CSS + ['</style>', '</head>', '<body>']) + "\n"
+
+# Page header, compiled once; only the placeholders change between reports
+HEADER_TEMPLATE = Template("\n".join([
+    '<div class="header">',
+    '<h1>$title</h1>',
+    '</div>',
+    '<div class="container">',
+    '<img src="$logo_src" class="logo" alt="Valeo Logo">',
+    '<dl class="info-list">',
+    '<dt>Generated:</dt><dd>$generated</dd>',
+    '<dt>Stations:</dt><dd>$stations</dd>',
+    '<dt>Analyzed Stations:</dt><dd>$analyzed</dd>',
+    '<dt>State:</dt><dd>$state</dd>',
+    '<dt>From:</dt><dd>$start</dd>',
+    '<dt>To:</dt><dd>$end</dd>',
+    '</dl>',
+]) + "\n")
+
+TROUBLESHOOTING_HEADER = ('<table class="troubleshooting">\n'
+                          '<tr><th>Station</th><th>Root Cause</th><th>Possible Problem</th><th>Solution</th>'
+                          '<th>Count</th><th>Percentage</th></tr>\n')
+
+# Chart grids in page order; chart_specs() yields the specs section by section
+CHART_SECTIONS = [("summary", "summary-grid"), ("root_cause", "grid-container")]
+
+def kpi_cards_html(kpis):
+    cards = [("Total Units", "green", kpis["total_units"]),
+             ("Total OK", "blue", kpis["total_ok"]),
+             ("Total NG", "red", kpis["total_ng"]),
+             ("NG Percentage", "red", f"{kpis['ng_perc']:.1f}%")]
+    if kpis["fpy"] is not None:
+        cards.append(("First Pass Yield", "green", f"{kpis['fpy']:.1f}%"))
+        cards.append(("Rolled Throughput Yield", "green", f"{kpis['rty']:.1f}%"))
+    html = ['<div class="kpi-container">']
+    for title, color, value in cards:
+        html.append(f'<div class="kpi-card">\n<h3>{title}</h3>\n<p class="{color}">{value}</p>\n</div>')
+    html.append('</div>')
+    return "\n".join(html) + "\n"
+
+def _methods_list_html(methods_list, key):
+    items = ''.join(f'<li>{m.get(key, "N/A") if isinstance(m, dict) else m}</li>' for m in methods_list)
+    return f'<ul>{items}</ul>'
+
+def _troubleshooting_row_html(station, cause, methods_list, count, percentage):
+    # Split Possible Problem and Solution
+    if methods_list:
+        methods = (f'<td>{_methods_list_html(methods_list, "Possible Problem")}</td>\n'
+                   f'<td>{_methods_list_html(methods_list, "Solution")}</td>')
+    else:
+        methods = '<td>No methods defined</td>\n<td>No methods defined</td>'
+    return (f'<tr>\n<td>{station}</td>\n<td>{cause}</td>\n{methods}\n'
+            f'<td>{count}</td>\n<td>{percentage:.1f}%</td>\n</tr>\n')
+
+def write_troubleshooting(out, rows):
+    out.write('<h2>Troubleshooting Methods</h2>\n')
+    if not rows:
+        out.write("<p>No troubleshooting data available.</p>\n")
+        return
+    out.write(TROUBLESHOOTING_HEADER)
+    for row in rows:
+        out.write(_troubleshooting_row_html(*row))
+    out.write('</table>\n')
+
+def _chart_html(spec, src):
+    # inline SVG chart mode embeds the markup, PNG mode an image data URI
+    chart = src if src.startswith('<svg') else f'<img src="{src}" alt="{spec["alt"]}">'
+    return f'<div class="grid-item">\n{chart}\n<div class="caption">{spec["caption"]}</div>\n</div>\n'
+
+def write_report_html(out, model, title, logo_src, specs, images):
+    """Stream the report page to a text file object.
+
+    images may be any iterable of chart sources (data URIs or inline SVG) in the order of specs; each
+    chart is written as soon as it is produced so the page is never held in memory as a whole.
+    """
+    start, end = model.window_text(with_hour=True)
+    out.write(REPORT_HEAD)
+    out.write(HEADER_TEMPLATE.substitute(
+        title=title, logo_src=logo_src, generated=model.generated.strftime("%Y-%m-%d %H:%M:%S"),
+        stations=", ".join(model.stations), analyzed=", ".join(model.analyzed_stations),
+        state=model.state, start=start, end=end))
+    out.write(kpi_cards_html(model.kpis))
+
+    charts = zip(specs, images)
+    pending = next(charts, None)
+    for section, css_class in CHART_SECTIONS:
+        out.write(f'<div class="{css_class}">\n')
+        while pending is not None and pending[0]["section"] == section:
+            out.write(_chart_html(*pending))
+            pending = next(charts, None)
+        out.write('</div>\n')
+
+    write_troubleshooting(out, model.troubleshooting_rows)
+    out.write("</div>\n</body></html>\n")
+
+def render_report_html(model, title, logo_src, specs, images):
+    """Full report page as one string (see write_report_html)."""
+    buf = StringIO()
+    write_report_html(buf, model, title, logo_src, specs, images)
+    return buf.getvalue()
+
+SUMMARY_HEADER_TEMPLATE = Template("\n".join([
+    '<div class="header">',
+    '<h1>$title</h1>',
+    '</div>',
+    '<div class="container">',
+    '<img src="$logo_src" class="logo" alt="Valeo Logo">',
+    '<dl class="info-list">',
+    '<dt>Generated:</dt><dd>$generated</dd>',
+    '<dt>Lines:</dt><dd>$lines</dd>',
+    '<dt>Reported Lines:</dt><dd>$reported</dd>',
+    '<dt>From:</dt><dd>$start</dd>',
+    '<dt>To:</dt><dd>$end</dd>',
+    '</dl>',
+]) + "\n")
+
+SUMMARY_TABLE_HEADER = ('<table class="troubleshooting">\n'
+                  '<tr><th>Line</th><th>Database</th><th>Units</th><th>OK</th><th>NG</th><th>NG %</th>'
+                  '<th>FPY</th><th>RTY</th><th>Top Root Cause</th><th>Report</th></tr>\n')
+
+def _summary_row_html(line):
+    if line.get("error"):
+        return (f'<tr>\n<td>{line["name"]}</td>\n<td>{line["database"]}</td>\n'
+                f'<td colspan="8">Failed: {escape(str(line["error"]))}</td>\n</tr>\n')
+    k = line["kpis"]
+    fpy = f'{k["fpy"]:.1f}%' if k["fpy"] is not None else "N/A"
+    rty = f'{k["rty"]:.1f}%' if k["rty"] is not None else "N/A"
+    link = f'<a href="{line["report"]}">{line["report"]}</a>' if line.get("report") else "N/A"
+    return (f'<tr>\n<td>{line["name"]}</td>\n<td>{line["database"]}</td>\n<td>{k["total_units"]}</td>\n'
+            f'<td>{k["total_ok"]}</td>\n<td>{k["total_ng"]}</td>\n<td>{k["ng_perc"]:.1f}%</td>\n'
+            f'<td>{fpy}</td>\n<td>{rty}</td>\n<td>{line.get("top_cause") or "N/A"}</td>\n<td>{link}</td>\n</tr>\n')
+
+def write_summary_html(out, title, logo_src, generated, window, lines):
+    """Stream the cross-line summary page: totals over all lines and one row per line.
+
+    lines are dicts with name, database, kpis (ReportModel.kpis), top_cause, report (file name
+    relative to the summary) or error for a line that failed.
+    """
+    done = [line for line in lines if not line.get("error")]
+    total_ok = sum(line["kpis"]["total_ok"] for line in done)
+    total_ng = sum(line["kpis"]["total_ng"] for line in done)
+    total_units = sum(line["kpis"]["total_units"] for line in done)
+    out.write(REPORT_HEAD)
+    out.write(SUMMARY_HEADER_TEMPLATE.substitute(
+        title=title, logo_src=logo_src, generated=generated.strftime("%Y-%m-%d %H:%M:%S"),
+        lines=", ".join(line["name"] for line in lines), reported=", ".join(line["name"] for line in done),
+        start=window[0], end=window[1]))
+    # yields are not additive across lines, only the unit counts are
+    out.write(kpi_cards_html({"total_units": total_units, "total_ok": total_ok, "total_ng": total_ng,
+                              "ng_perc": total_ng / total_units * 100 if total_units > 0 else 0.0,
+                              "fpy": None, "rty": None}))
+    out.write('<h2>Lines</h2>\n')
+    out.write(SUMMARY_TABLE_HEADER)
+    for line in lines:
+        out.write(_summary_row_html(line))
+    out.write('</table>\n')
+    out.write("</div>\n</body></html>\n")
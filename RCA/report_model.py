@@ -0,0 +1,152 @@
+from datetime import datetime
+import pandas as pd
+from data_utils import normalize_result, result_counts, window_meta
+
+TOP_ROOT_CAUSES = 5
+TOP_TROUBLESHOOTING = 10
+
+def rate_frequency(start, end):
+    """Resample frequency, tick format and label rotation of the NG-rate chart for a window.
+
+    The span is counted in calendar days (times dropped), so 08:00 to 07:59 the next day is one day.
+    """
+    days = (pd.Timestamp(end).normalize() - pd.Timestamp(start).normalize()).days \
+        if start is not None and end is not None else 0
+    if days <= 1:
+        return '4H', '%Y-%m-%d %H:%M', 45
+    elif days <= 10:
+        return 'D', '%Y-%m-%d', 45
+    elif days <= 30:
+        return 'W', '%Y-%m-%d', 45
+    return 'M', '%Y-%m', 45
+
+def report_week(start):
+    """ISO week number of the report window start (today when the window is unknown)."""
+    return (start.date() if start is not None else datetime.now().date()).isocalendar()[1]
+
+class ReportModel:
+    """Every number and series the HTML report shows, computed in one pass over the stations.
+
+    The charts and the HTML are rendered from this model only, so both report entry points
+    (auto-open and save) share the same figures and the frames are scanned once per report.
+    """
+    def __init__(self, stations, retrieved_dfs, analysis_results, troubleshooting=None, lineage=None,
+                 state=None, window=None, result_series=None):
+        self.stations = list(stations)
+        self.analyzed_stations = list(analysis_results)
+        self.state = state
+        self.generated = datetime.now()
+        result_series = result_series or (lambda station: normalize_result(retrieved_dfs.get(station)))
+
+        if window is None:
+            metas = [window_meta(df) for df in retrieved_dfs.values()]
+            starts = [m["start"] for m in metas if m["start"] is not None]
+            ends = [m["end"] for m in metas if m["end"] is not None]
+            window = (min(starts) if starts else None, max(ends) if ends else None)
+        self.start, self.end = window
+        self.week_no = report_week(self.start)
+
+        # Per-station OK/NG counts, in station order
+        self.station_counts = []
+        max_ng_station = None
+        max_ng = -1
+        for station in self.stations:
+            df = retrieved_dfs.get(station)
+            if df is None:
+                continue
+            counts = result_counts(result_series(station))
+            ok, ng = counts["OK"], counts["NG"]
+            self.station_counts.append({"station": station, "ok": ok, "ng": ng, "rows": len(df),
+                                        "ng_perc": (ng / (ok + ng) * 100) if ok + ng > 0 else 0})
+            # the station with the most NG stands for the line when units are not tracked by serial
+            if ng > max_ng:
+                max_ng = ng
+                max_ng_station = station
+
+        freq, self.time_format, self.rotation = rate_frequency(self.start, self.end)
+        if lineage is not None:
+            k = lineage.kpis()
+            self.kpis = {"total_units": k["units"], "total_ok": k["ok_units"], "total_ng": k["ng_units"],
+                         "ng_perc": k["ng_perc"], "fpy": k["fpy"], "rty": k["rty"]}
+            self.pie = {"label": "units", "ok": k["ok_units"], "ng": k["ng_units"]}
+        else:
+            self.kpis = {"total_units": 0, "total_ok": 0, "total_ng": 0, "ng_perc": 0.0, "fpy": None, "rty": None}
+            self.pie = None
+            for row in self.station_counts:
+                if row["station"] == max_ng_station:
+                    self.kpis.update(total_units=row["rows"], total_ok=row["ok"], total_ng=row["ng"],
+                                     ng_perc=(row["ng"] / row["rows"] * 100) if row["rows"] > 0 else 0.0)
+                    self.pie = {"label": max_ng_station, "ok": row["ok"], "ng": row["ng"]}
+
+        if lineage is not None and lineage.units["failed"].any():
+            # Units bucketed by first appearance, NG when they failed at any station
+            total_counts, ng_counts = lineage.ng_units_by_time(freq)
+            self.ng_rate = self._rate_series("units", total_counts, ng_counts)
+        elif max_ng_station is None or max_ng == 0:
+            self.ng_rate = {"message": "No NG data available"}
+        else:
+            df = retrieved_dfs.get(max_ng_station)
+            if df is None or 'Date_Time' not in df or df.empty:
+                self.ng_rate = {"message": "No data available"}
+            else:
+                # Date_Time is parsed at ingest; only the two columns needed here are taken
+                rate_df = df[['Date_Time']].assign(Result=result_series(max_ng_station)).dropna(subset=['Date_Time'])
+                rate_df = rate_df.set_index('Date_Time')
+                total_counts = rate_df.resample(freq).size()
+                ng_counts = rate_df[rate_df['Result'] == 'NG'].resample(freq).size()
+                self.ng_rate = self._rate_series(max_ng_station, total_counts, ng_counts)
+
+        # NG root causes per analyzed station, shared by the charts and the troubleshooting table
+        self.root_causes = {}
+        rows = []
+        total_ng = self.kpis["total_ng"]
+        for station, result in analysis_results.items():
+            if result is None or result.empty:
+                self.root_causes[station] = {"message": f"No data for {station}"}
+                continue
+            ng = result.loc[result["Prediction"].astype(str).str.upper() == "NG", "Root_Cause"]
+            if ng.empty:
+                self.root_causes[station] = {"message": f"No NG data for {station}"}
+                continue
+            cause_counts = ng.value_counts()
+            if cause_counts.empty:
+                self.root_causes[station] = {"message": "No root causes"}
+                continue
+            top = cause_counts.head(TOP_ROOT_CAUSES)
+            self.root_causes[station] = {"causes": [str(c) for c in top.index], "counts": [int(n) for n in top.values]}
+            methods = (troubleshooting or {}).get(station, {})
+            for cause, count in cause_counts.items():
+                rows.append([station, cause, methods.get(str(cause), []), int(count),
+                             (count / total_ng * 100) if total_ng > 0 else 0])
+        # Sort by count (descending) and limit to top 10
+        self.troubleshooting_rows = sorted(rows, key=lambda x: x[3], reverse=True)[:TOP_TROUBLESHOOTING]
+
+    @staticmethod
+    def _rate_series(label, total_counts, ng_counts):
+        ng_counts = ng_counts.reindex(total_counts.index, fill_value=0)
+        ng_rate = (ng_counts / total_counts * 100).fillna(0)
+        if ng_rate.empty:
+            return {"message": "No NG data available"}
+        return {"label": label, "index": list(ng_rate.index), "rate": [float(v) for v in ng_rate.values],
+                "count": [int(v) for v in ng_counts.values]}
+
+    @staticmethod
+    def app_state_args():
+        """Constructor arguments from AppState, snapshotted so the model can be built on another thread
+        while the app retrieves or analyzes new data."""
+        from app_state import AppState
+        stations = list(AppState.selected_tables)
+        results = {s: AppState.result_series(s) for s in stations if s in AppState.retrieved_dfs}
+        return {"stations": stations, "retrieved_dfs": dict(AppState.retrieved_dfs),
+                "analysis_results": dict(AppState.analysis_results), "troubleshooting": AppState.troubleshooting,
+                "lineage": AppState.lineage, "state": AppState.state, "window": AppState.overall_window(),
+                "result_series": results.get}
+
+    @classmethod
+    def from_app_state(cls):
+        return cls(**cls.app_state_args())
+
+    def window_text(self, with_hour=True):
+        fmt = '%Y-%m-%d %H:%M:%S' if with_hour else '%Y-%m-%d'
+        return (self.start.strftime(fmt) if self.start is not None else 'N/A',
+                self.end.strftime(fmt) if self.end is not None else 'N/A')
@@ -0,0 +1,183 @@
+import math
+from html import escape
+
+# Inline SVG versions of the report charts, drawn from the same chart specs as report_charts.py
+# without Matplotlib. Sizes follow the PNG figures at 100 dpi.
+OK_COLOR = '#6366f1'
+NG_COLOR = '#ef4444'
+TEXT_COLOR = '#1f2a44'
+GRID_COLOR = '#e2e8f0'
+FACE_COLOR = '#f8fafc'
+DPI = 100
+
+def _num(v):
+    return f"{v:.1f}".rstrip('0').rstrip('.')
+
+def _text(x, y, s, size=8, anchor='middle', weight='normal', rotate=None, color=TEXT_COLOR):
+    transform = f' transform="rotate({rotate} {_num(x)} {_num(y)})"' if rotate else ''
+    return (f'<text x="{_num(x)}" y="{_num(y)}" font-size="{size}" text-anchor="{anchor}" '
+            f'font-weight="{weight}" fill="{color}"{transform}>{escape(str(s))}</text>')
+
+def _nice_ticks(vmax, count=5):
+    if vmax <= 0:
+        return [0, 1], 1
+    raw = vmax / count
+    mag = 10 ** math.floor(math.log10(raw))
+    step = next(m * mag for m in (1, 2, 2.5, 5, 10) if m * mag >= raw)
+    ticks = [i * step for i in range(int(vmax // step) + 1)]
+    return ticks, step
+
+class _Canvas:
+    def __init__(self, figsize, title, title_size=10, left=45, right=12, top=24, bottom=62):
+        self.w, self.h = figsize[0] * DPI, figsize[1] * DPI
+        self.left, self.top = left, top
+        self.pw, self.ph = self.w - left - right, self.h - top - bottom
+        self.parts = [_text(self.w / 2, 15, title, size=title_size, weight='500')]
+
+    def frame(self, ymax, ylabel, xlabel, label_size=8, percent=False):
+        self.ymax = ymax or 1
+        self.parts.append(f'<rect x="{_num(self.left)}" y="{_num(self.top)}" width="{_num(self.pw)}" '
+                          f'height="{_num(self.ph)}" fill="{FACE_COLOR}" stroke="#94a3b8" stroke-width="0.8"/>')
+        ticks, _ = _nice_ticks(self.ymax)
+        for t in ticks:
+            y = self.y(t)
+            self.parts.append(f'<line x1="{_num(self.left)}" y1="{_num(y)}" x2="{_num(self.left + self.pw)}" y2="{_num(y)}" '
+                              f'stroke="{GRID_COLOR}" stroke-dasharray="3,3"/>')
+            self.parts.append(_text(self.left - 4, y + 3, _num(t), size=7, anchor='end'))
+        self.parts.append(_text(11, self.top + self.ph / 2, ylabel, size=label_size, rotate=-90))
+        self.parts.append(_text(self.left + self.pw / 2, self.h - 3, xlabel, size=label_size))
+
+    def y(self, v):
+        return self.top + self.ph - (v / self.ymax) * self.ph
+
+    def x_labels(self, xs, labels, size=6):
+        base = self.top + self.ph + 9
+        for x, label in zip(xs, labels):
+            self.parts.append(_text(x, base, label, size=size, anchor='end', rotate=-45))
+
+    def bar(self, x, width, value, color):
+        y = self.y(value)
+        self.parts.append(f'<rect x="{_num(x)}" y="{_num(y)}" width="{_num(width)}" height="{_num(self.top + self.ph - y)}" fill="{color}"/>')
+
+    def svg(self):
+        return (f'<svg class="chart" xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_num(self.w)} {_num(self.h)}" '
+                f'width="{_num(self.w)}" height="{_num(self.h)}" font-family="Helvetica, sans-serif">'
+                + "".join(self.parts) + '</svg>')
+
+def _no_data(figsize, title, message="No data available", size=10):
+    c = _Canvas(figsize, title, title_size=size)
+    c.parts.append(_text(c.w / 2, c.h / 2, message, size=size))
+    return c.svg()
+
+def svg_ok_ng_combined(figsize, data):
+    labels, ok, ng = data["labels"], data["ok"], data["ng"]
+    if not labels:
+        return _no_data(figsize, "OK vs NG by Stations")
+    c = _Canvas(figsize, "OK vs NG by Stations", right=40)
+    max_height = max(o + n for o, n in zip(ok, ng))
+    c.frame(max_height * 1.1, "Count", "Stations")
+    slot = c.pw / len(labels)
+    bar = slot * 0.35
+    centers = [c.left + slot * (i + 0.5) for i in range(len(labels))]
+    for x, o, n in zip(centers, ok, ng):
+        c.bar(x - bar, bar, o, OK_COLOR)
+        c.bar(x, bar, n, NG_COLOR)
+        if o > 0:
+            c.parts.append(_text(x - bar / 2, c.y(o) - 2, o, size=8))
+        if n > 0:
+            c.parts.append(_text(x + bar / 2, c.y(n) - 2, n, size=8))
+    c.x_labels(centers, labels)
+    lx = c.w - 38
+    for i, (name, color) in enumerate((("OK", OK_COLOR), ("NG", NG_COLOR))):
+        c.parts.append(f'<rect x="{lx}" y="{c.top + 4 + i * 12}" width="8" height="8" fill="{color}"/>')
+        c.parts.append(_text(lx + 11, c.top + 11 + i * 12, name, size=8, anchor='start'))
+    return c.svg()
+
+def svg_ng_percentage(figsize, data):
+    labels, perc = data["labels"], data["perc"]
+    if not labels:
+        return _no_data(figsize, "NG Percentage by Station")
+    c = _Canvas(figsize, "NG Percentage by Station")
+    c.frame(max(perc, default=0) + 5, "NG %", "Stations")
+    slot = c.pw / len(labels)
+    bar = slot * 0.8
+    centers = [c.left + slot * (i + 0.5) for i in range(len(labels))]
+    for x, p in zip(centers, perc):
+        c.bar(x - bar / 2, bar, p, NG_COLOR)
+        c.parts.append(_text(x, c.y(p) - 2, f"{p:.1f}%", size=8))
+    c.x_labels(centers, labels)
+    return c.svg()
+
+def svg_ok_ng_pie(figsize, data):
+    if data is None or data["ok"] + data["ng"] <= 0:
+        return _no_data(figsize, "Total OK vs NG")
+    c = _Canvas(figsize, "Total OK vs NG")
+    total = data["ok"] + data["ng"]
+    cx, cy = c.w / 2, c.top + (c.h - c.top) / 2
+    r = (c.h - c.top) / 2 - 22
+    start = 90.0
+    for name, value, color, explode in (("OK", data["ok"], OK_COLOR, 0.1), ("NG", data["ng"], NG_COLOR, 0.0)):
+        if value <= 0:
+            continue
+        sweep = value / total * 360
+        mid = math.radians(start + sweep / 2)
+        ox, oy = cx + explode * r * math.cos(mid), cy - explode * r * math.sin(mid)
+        if sweep >= 359.999:
+            c.parts.append(f'<circle cx="{_num(ox)}" cy="{_num(oy)}" r="{_num(r)}" fill="{color}"/>')
+        else:
+            a0, a1 = math.radians(start), math.radians(start + sweep)
+            x0, y0 = ox + r * math.cos(a0), oy - r * math.sin(a0)
+            x1, y1 = ox + r * math.cos(a1), oy - r * math.sin(a1)
+            large = 1 if sweep > 180 else 0
+            c.parts.append(f'<path d="M{_num(ox)},{_num(oy)} L{_num(x0)},{_num(y0)} A{_num(r)},{_num(r)} 0 {large} 0 '
+                           f'{_num(x1)},{_num(y1)} Z" fill="{color}"/>')
+        c.parts.append(_text(ox + 1.15 * r * math.cos(mid), oy - 1.15 * r * math.sin(mid) + 3, name, size=8))
+        c.parts.append(_text(ox + 0.6 * r * math.cos(mid), oy - 0.6 * r * math.sin(mid) + 3,
+                             f"{value / total * 100:.1f}%", size=8))
+        start += sweep
+    return c.svg()
+
+def svg_ng_rate_by_time(figsize, data):
+    if "message" in data:
+        return _no_data(figsize, "NG Rate by Time", data["message"])
+    index, rates, counts = data["index"], data["rate"], data["count"]
+    c = _Canvas(figsize, f"NG Rate by Time ({data['label']})")
+    max_rate = max(max(rates) * 1.1, 5)
+    c.frame(max_rate, "NG Rate (%)", "Time")
+    n = len(index)
+    xs = [c.left + (c.pw * (i + 0.5) / n) for i in range(n)]
+    points = " ".join(f"{_num(x)},{_num(c.y(r))}" for x, r in zip(xs, rates))
+    c.parts.append(f'<polyline points="{points}" fill="none" stroke="{NG_COLOR}" stroke-width="2"/>')
+    for x, r, count in zip(xs, rates, counts):
+        if count > 0:
+            c.parts.append(_text(x, c.y(r) - 3, int(count), size=6))
+    c.x_labels(xs, [t.strftime(data["time_format"]) for t in index])
+    return c.svg()
+
+def svg_root_causes(figsize, data):
+    title = f"Top 5 Root Causes for {data['station']}"
+    if "message" in data:
+        return _no_data(figsize, title, data["message"], size=8)
+    causes, counts = data["causes"], data["counts"]
+    c = _Canvas(figsize, title, title_size=8, left=34, bottom=58)
+    c.frame(max(counts) * 1.1, "Count", "Root Cause", label_size=6)
+    slot = c.pw / len(counts)
+    bar = slot * 0.8
+    centers = [c.left + slot * (i + 0.5) for i in range(len(counts))]
+    for x, n in zip(centers, counts):
+        c.bar(x - bar / 2, bar, n, NG_COLOR)
+        if n > 0:
+            c.parts.append(_text(x, c.y(n) - 2, int(n), size=6))
+    c.x_labels(centers, causes, size=5)
+    return c.svg()
+
+SVG_RENDERERS = {
+    "ok_ng_combined": svg_ok_ng_combined,
+    "ng_percentage": svg_ng_percentage,
+    "ok_ng_pie": svg_ok_ng_pie,
+    "ng_rate_by_time": svg_ng_rate_by_time,
+    "root_causes": svg_root_causes,
+}
+
+def render_chart_svg(spec):
+    return SVG_RENDERERS[spec["kind"]](spec["figsize"], spec["data"])
@@ -0,0 +1,248 @@
+import os
+import importlib.util
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pandas as pd
+from app_state import log
+from lineage import detect_serial_column
+
+# Retrieved columns kept next to the analysis results, the rule features stay in MySQL
+STORE_COLUMNS = ["Date_Time", "Model", "State", "Result"]
+RESULT_COLUMNS = ["Prediction", "Root_Cause", "Match_Path"]
+INDEX_FILE = "index.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS partitions (
+    id INTEGER PRIMARY KEY,
+    station TEXT NOT NULL,
+    day TEXT NOT NULL,
+    path TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    ng_rows INTEGER NOT NULL,
+    run_id TEXT,
+    updated TEXT,
+    UNIQUE (station, day)
+);
+CREATE INDEX IF NOT EXISTS ix_partitions_day ON partitions (day);
+CREATE TABLE IF NOT EXISTS serials (
+    serial TEXT NOT NULL,
+    partition_id INTEGER NOT NULL,
+    PRIMARY KEY (serial, partition_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS causes (
+    root_cause TEXT NOT NULL,
+    partition_id INTEGER NOT NULL,
+    ng_rows INTEGER NOT NULL,
+    PRIMARY KEY (root_cause, partition_id)
+) WITHOUT ROWID;
+"""
+
+def default_store_dir():
+    return os.path.join(os.getcwd(), "Result_Store")
+
+def parquet_available():
+    return importlib.util.find_spec("pyarrow") is not None
+
+class ResultStore:
+    """Analyzed rows persisted as Parquet partitioned by station and day, with a SQLite index.
+
+    Layout: <root>/station=<name>/day=<YYYY-MM-DD>/part.parquet. The index maps serials and
+    NG root causes to partitions so lookups only open the files that can match.
+    """
+    def __init__(self, root=None):
+        self.root = root or default_store_dir()
+        os.makedirs(self.root, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        # one transaction per block, committed on success and rolled back on error
+        conn = sqlite3.connect(os.path.join(self.root, INDEX_FILE), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _partition_path(self, station, day):
+        return os.path.join(self.root, f"station={station}", f"day={day}", "part.parquet")
+
+    def write(self, station, rows, run_id):
+        """Merge one station's analyzed rows into its day partitions.
+
+        Stored rows of the same station inside the Date_Time window of the new rows are replaced,
+        also on days of the window that get no new rows, so re-analyzing a window does not
+        duplicate or keep stale rows of it. Returns the number of new rows.
+        """
+        rows = rows.dropna(subset=["Date_Time"])
+        if rows.empty:
+            return 0
+        start, end = rows["Date_Time"].min(), rows["Date_Time"].max()
+        new_parts = dict(tuple(rows.groupby(rows["Date_Time"].dt.strftime("%Y-%m-%d"), sort=True)))
+        updated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._connect() as conn:
+            stored = [r[0] for r in conn.execute("SELECT day FROM partitions WHERE station = ? AND day BETWEEN ? AND ?",
+                                                 (station, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))]
+            for day in sorted(set(stored) | set(new_parts)):
+                path = self._partition_path(station, day)
+                part = new_parts.get(day, rows.iloc[:0])
+                if os.path.exists(path):
+                    old = pd.read_parquet(path)
+                    old = old.loc[(old["Date_Time"] < start) | (old["Date_Time"] > end)]
+                    part = pd.concat([old, part], ignore_index=True)
+                if part.empty:
+                    self._drop_partition(conn, station, day, path)
+                    continue
+                part = part.sort_values("Date_Time", kind="mergesort").reset_index(drop=True)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = path + ".tmp"
+                part.to_parquet(tmp, index=False)
+                os.replace(tmp, path)
+                self._index_partition(conn, station, day, path, part, run_id, updated)
+        return len(rows)
+
+    def _drop_partition(self, conn, station, day, path):
+        """Remove a partition left without rows, with its index entries."""
+        row = conn.execute("SELECT id FROM partitions WHERE station = ? AND day = ?", (station, day)).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM serials WHERE partition_id = ?", (row[0],))
+            conn.execute("DELETE FROM causes WHERE partition_id = ?", (row[0],))
+            conn.execute("DELETE FROM partitions WHERE id = ?", (row[0],))
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _index_partition(self, conn, station, day, path, part, run_id, updated):
+        ng = part["Prediction"] == "NG"
+        conn.execute(
+            "INSERT INTO partitions (station, day, path, rows, ng_rows, run_id, updated) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (station, day) DO UPDATE SET path = excluded.path, rows = excluded.rows, "
+            "ng_rows = excluded.ng_rows, run_id = excluded.run_id, updated = excluded.updated",
+            (station, day, os.path.relpath(path, self.root), len(part), int(ng.sum()), run_id, updated))
+        pid = conn.execute("SELECT id FROM partitions WHERE station = ? AND day = ?", (station, day)).fetchone()[0]
+        conn.execute("DELETE FROM serials WHERE partition_id = ?", (pid,))
+        conn.execute("DELETE FROM causes WHERE partition_id = ?", (pid,))
+        serials = part["Serial"].dropna().unique()
+        conn.executemany("INSERT INTO serials (serial, partition_id) VALUES (?, ?)", ((str(s), pid) for s in serials))
+        causes = part.loc[ng, "Root_Cause"].astype(str).value_counts()
+        conn.executemany("INSERT INTO causes (root_cause, partition_id, ng_rows) VALUES (?, ?, ?)",
+                         ((cause, pid, int(n)) for cause, n in causes.items()))
+
+    def _partitions(self, serial=None, root_cause=None, station=None, since=None, until=None):
+        sql = "SELECT DISTINCT p.path FROM partitions p"
+        conditions = []
+        params = []
+        if serial is not None:
+            sql += " JOIN serials s ON s.partition_id = p.id"
+            conditions.append("s.serial = ?")
+            params.append(str(serial))
+        if root_cause is not None:
+            sql += " JOIN causes c ON c.partition_id = p.id"
+            conditions.append("c.root_cause = ?")
+            params.append(str(root_cause))
+        if station:
+            conditions.append("p.station = ?")
+            params.append(station)
+        if since is not None:
+            conditions.append("p.day >= ?")
+            params.append(pd.Timestamp(since).strftime("%Y-%m-%d"))
+        if until is not None:
+            conditions.append("p.day <= ?")
+            params.append(pd.Timestamp(until).strftime("%Y-%m-%d"))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._connect() as conn:
+            return [os.path.join(self.root, r[0]) for r in conn.execute(sql + " ORDER BY p.day, p.station", params)]
+
+    def query(self, serial=None, root_cause=None, station=None, prediction=None, since=None, until=None):
+        """Stored rows matching every given filter, ordered by Date_Time."""
+        frames = []
+        for path in self._partitions(serial, root_cause, station, since, until):
+            if not os.path.exists(path):
+                continue
+            df = pd.read_parquet(path)
+            mask = pd.Series(True, index=df.index)
+            if serial is not None:
+                mask &= df["Serial"] == str(serial)
+            if root_cause is not None:
+                mask &= df["Root_Cause"].astype(str) == str(root_cause)
+                if prediction is None:
+                    mask &= df["Prediction"] == "NG"
+            if prediction is not None:
+                mask &= df["Prediction"] == prediction
+            if since is not None:
+                mask &= df["Date_Time"] >= pd.Timestamp(since)
+            if until is not None:
+                mask &= df["Date_Time"] <= pd.Timestamp(until)
+            frames.append(df.loc[mask])
+        if not frames:
+            return pd.DataFrame(columns=["Station", "Serial"] + STORE_COLUMNS + RESULT_COLUMNS + ["Run_ID"])
+        return pd.concat(frames, ignore_index=True).sort_values("Date_Time", kind="mergesort").reset_index(drop=True)
+
+    def ng_units(self, root_cause=None, days=30, station=None):
+        """NG units (latest NG pass per serial) in the last `days` days, optionally for one root cause."""
+        since = datetime.now() - timedelta(days=days) if days else None
+        df = self.query(root_cause=root_cause, station=station, prediction="NG", since=since)
+        if df["Serial"].notna().any():
+            df = df.dropna(subset=["Serial"]).drop_duplicates("Serial", keep="last").reset_index(drop=True)
+        return df
+
+    def unit_history(self, serial):
+        """Every stored pass of one serial across stations, in time order."""
+        return self.query(serial=serial)
+
+    def root_causes(self):
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT root_cause FROM causes ORDER BY root_cause")]
+
+    def stations(self):
+        with self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT station FROM partitions ORDER BY station")]
+
+def _store_frame(station, df, result, serial_col, run_id):
+    cols = [c for c in STORE_COLUMNS if c in df.columns]
+    out = df[cols].join(result[RESULT_COLUMNS])
+    for col in STORE_COLUMNS:
+        if col not in out.columns:
+            out[col] = None
+    out["Date_Time"] = pd.to_datetime(out["Date_Time"], errors="coerce")
+    for col in ["Model", "State", "Result", "Prediction", "Root_Cause", "Match_Path"]:
+        out[col] = out[col].astype(object).where(out[col].notna(), None).astype("string")
+    if serial_col and serial_col in df.columns:
+        serial = df[serial_col].astype(str).str.strip()
+        out.insert(0, "Serial", serial.where(df[serial_col].notna() & (serial != "")).astype("string"))
+    else:
+        out.insert(0, "Serial", pd.Series(pd.NA, index=out.index, dtype="string"))
+    out.insert(0, "Station", station)
+    out["Run_ID"] = run_id
+    return out
+
+def store_analysis_results(retrieved_dfs, results, root=None, serial_column="", emit=log):
+    """Persist the analysis results of one run with their Date_Time, Result and serial columns.
+
+    Failures are reported through emit and never interrupt the run. Returns the rows written.
+    """
+    if not results:
+        return 0
+    if not parquet_available():
+        emit("pyarrow is not installed, analysis results are not persisted to the result store")
+        return 0
+    try:
+        store = ResultStore(root)
+    except (OSError, sqlite3.Error) as e:
+        emit(f"Cannot open result store: {e}")
+        return 0
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    serial_col = detect_serial_column(retrieved_dfs, serial_column)
+    total = 0
+    for station, result in results.items():
+        df = retrieved_dfs.get(station)
+        if df is None or df.empty or "Date_Time" not in df.columns:
+            continue
+        try:
+            total += store.write(station, _store_frame(station, df, result, serial_col, run_id), run_id)
+        except Exception as e:
+            emit(f"Failed to persist results of {station}: {e}")
+    emit(f"Persisted {total} analyzed rows to result store {store.root}")
+    return total
@@ -0,0 +1,206 @@
+import os
+import datetime as dt
+import pandas as pd
+from pandas.api.types import union_categoricals
+from sqlalchemy import inspect, text
+from app_state import log
+from data_utils import ingest_retrieved_frame, prepare_retrieved_frame, compact_dataframe, window_meta, format_bytes
+from analysis_utils import station_required_columns
+from lineage import SERIAL_CANDIDATES
+
+# Columns the reports need besides the rule features
+BASE_COLUMNS = ["Date_Time", "Result", "State", "Model"]
+# CPython str header plus the pointer held by the object array
+OBJECT_OVERHEAD = 57
+
+def _where_clause(state, dt_from, dt_to):
+    conditions = []
+    params = {}
+    if state:
+        conditions.append("State = :state")
+        params['state'] = state
+    conditions.append("Date_Time BETWEEN :from_dt AND :to_dt")
+    params['from_dt'] = dt_from
+    params['to_dt'] = dt_to
+    return " WHERE " + " AND ".join(conditions), params
+
+def build_station_query(table, state, dt_from, dt_to, columns=None):
+    where, params = _where_clause(state, dt_from, dt_to)
+    select = ", ".join(f"`{c}`" for c in columns) if columns else "*"
+    return f"SELECT {select} FROM `{table}`" + where, params
+
+def station_keep_columns(rules, station, serial_column=""):
+    """Columns kept when a station is streamed or projected: its rule features and the report
+    columns (only the report columns for a station without rules, which is never analyzed)."""
+    features = station_required_columns(rules.get(station))
+    return features | set(BASE_COLUMNS) | set(SERIAL_CANDIDATES) | ({serial_column} if serial_column else set())
+
+def available_memory_bytes():
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        pass
+    try:
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", ctypes.c_ulong), ("dwMemoryLoad", ctypes.c_ulong),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("sullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        stat = MEMORYSTATUSEX()
+        stat.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(stat)):
+            return stat.ullAvailPhys
+    except Exception:
+        pass
+    return None
+
+def memory_budget_bytes(budget_mb=0):
+    """Configured budget in bytes; 0 means half of the currently available RAM."""
+    if budget_mb:
+        return int(budget_mb) * 1024 * 1024
+    avail = available_memory_bytes()
+    return int(avail * 0.5) if avail else 2 * 1024 ** 3
+
+def _column_bytes(col_type):
+    try:
+        py_type = col_type.python_type
+    except (NotImplementedError, AttributeError):
+        py_type = str
+    if py_type in (int, float, bool, dt.datetime, dt.date, dt.timedelta):
+        return 8
+    length = getattr(col_type, "length", None) or 32
+    return OBJECT_OVERHEAD + min(length, 256)
+
+def estimate_table_bytes(engine, table, state, dt_from, dt_to, columns=None):
+    """Estimate the in-memory size of a window from the schema and a COUNT(*) of the same filter.
+
+    columns limits the estimate to a projection. Returns (estimated_bytes, row_count, bytes_per_row).
+    """
+    columns = [c for c in inspect(engine).get_columns(table) if not columns or c["name"] in columns]
+    row_bytes = 8 + sum(_column_bytes(c["type"]) for c in columns)
+    where, params = _where_clause(state, dt_from, dt_to)
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT COUNT(*) FROM `{table}`" + where), params).scalar() or 0
+    return rows * row_bytes, rows, row_bytes
+
+def projected_columns(engine, table, keep_columns):
+    """Table columns in keep_columns, in table order; None (all columns) when nothing is known or matches."""
+    if not keep_columns:
+        return None
+    try:
+        columns = [c["name"] for c in inspect(engine).get_columns(table) if c["name"] in keep_columns]
+    except Exception:
+        return None
+    return columns or None
+
+def fetch_station_table(engine, table, state, dt_from, dt_to, budget_bytes, keep_columns=None, emit=log, project=False):
+    """Fetch one station window, in memory when its estimate fits the budget, streamed otherwise.
+
+    A streamed table is read through a server-side cursor in chunks of the keep_columns only, so
+    neither the driver nor the frame ever holds the full rows, and compacted as it arrives; it
+    raises MemoryBudgetExceeded when even the compacted table does not fit. With project, only
+    keep_columns are selected from the database in both cases. Returns (df, meta).
+    """
+    columns = projected_columns(engine, table, keep_columns) if project else None
+    if columns:
+        emit(f"{table}: selecting {len(columns)} columns")
+    query, params = build_station_query(table, state, dt_from, dt_to, columns)
+    try:
+        estimate, rows, row_bytes = estimate_table_bytes(engine, table, state, dt_from, dt_to, columns)
+    except Exception as e:
+        emit(f"Size estimate failed for {table}, fetching in memory: {e}")
+        estimate = None
+
+    if estimate is None or estimate <= budget_bytes:
+        if estimate is not None:
+            emit(f"{table}: estimated {format_bytes(estimate)} for {rows} rows, within budget {format_bytes(budget_bytes)}; fetching in memory")
+        df = pd.read_sql_query(text(query), engine, params=params)
+        df, meta = ingest_retrieved_frame(df)
+        meta["mode"] = "memory"
+        return df, meta
+
+    if not columns:
+        columns = projected_columns(engine, table, keep_columns)
+        if columns:
+            query, params = build_station_query(table, state, dt_from, dt_to, columns)
+            row_bytes = estimate_table_bytes(engine, table, state, dt_from, dt_to, columns)[2]
+    chunk_rows = max(10000, int(budget_bytes // 8 // max(row_bytes, 1)))
+    emit(f"{table}: estimated {format_bytes(estimate)} for {rows} rows exceeds budget {format_bytes(budget_bytes)}; "
+         f"streaming {len(columns) if columns else 'all'} columns in chunks of {chunk_rows} rows")
+    return _fetch_streamed(engine, table, query, params, chunk_rows, emit, budget_bytes)
+
+class MemoryBudgetExceeded(MemoryError):
+    """A streamed table does not fit the memory budget even compacted."""
+
+def _missing_piece(like, rows):
+    """All-missing stand-in, joinable with like, for a column compact_dataframe dropped from a chunk."""
+    if pd.api.types.is_datetime64_any_dtype(like):
+        return pd.Series(pd.NaT, index=range(rows), dtype=like.dtype)
+    if pd.api.types.is_numeric_dtype(like) and not pd.api.types.is_bool_dtype(like):
+        return pd.Series(float("nan"), index=range(rows))
+    return pd.Series([None] * rows, dtype=object)
+
+def _concat_column(pieces):
+    """Join the pieces of one column, keeping it as compact as each chunk was: categorical when any
+    chunk made it categorical (with the union of the categories), numbers downcast again."""
+    if any(isinstance(piece.dtype, pd.CategoricalDtype) for piece in pieces):
+        pieces = [piece.astype("category") for piece in pieces]
+        dtype = pd.CategoricalDtype(union_categoricals(pieces, ignore_order=True).categories)
+        pieces = [piece.astype(dtype) for piece in pieces]
+    out = pd.concat(pieces, ignore_index=True)
+    if pd.api.types.is_integer_dtype(out) and not pd.api.types.is_bool_dtype(out):
+        out = pd.to_numeric(out, downcast="integer")
+    return out
+
+def _fetch_streamed(engine, table, query, params, chunk_rows, emit, budget_bytes):
+    """Read a window chunk by chunk, compacting each chunk as it arrives.
+
+    Chunks are held as separate columns owning their memory, and the frame is joined one column
+    at a time, releasing that column's pieces before the next one, so the peak is the compacted
+    table plus one column. MemoryBudgetExceeded is raised as soon as the compacted chunks, or
+    the join, would go over budget_bytes.
+    """
+    chunks = []
+    held = 0
+    mem_before = 0
+    # stream_results makes the MySQL driver use an unbuffered (server-side) cursor
+    stmt = text(query).execution_options(stream_results=True)
+    with engine.connect() as conn:
+        for chunk in pd.read_sql_query(stmt, conn, params=params, chunksize=chunk_rows):
+            chunk = prepare_retrieved_frame(chunk)
+            mem_before += int(chunk.memory_usage(deep=True).sum())
+            chunk, _, size = compact_dataframe(chunk)
+            # copies so every column owns its memory and is freed on its own during the join
+            chunks.append((len(chunk), {col: chunk[col].copy() for col in chunk.columns}))
+            del chunk
+            held += size
+            if held > budget_bytes:
+                raise MemoryBudgetExceeded(
+                    f"{table}: {sum(n for n, _ in chunks)} rows already take {format_bytes(held)} compacted, "
+                    f"over the memory budget of {format_bytes(budget_bytes)}; narrow the window or raise memory_budget_mb")
+    columns = list(dict.fromkeys(col for _, cols in chunks for col in cols))
+    largest = max((sum(int(cols[col].memory_usage(deep=True)) for _, cols in chunks if col in cols) for col in columns),
+                  default=0)
+    if held + largest > budget_bytes:
+        raise MemoryBudgetExceeded(f"{table}: joining {format_bytes(held)} of chunks needs {format_bytes(largest)} more, "
+                                   f"over the memory budget of {format_bytes(budget_bytes)}")
+    out = {}
+    for col in columns:
+        # a column that is empty within one chunk was dropped from it by compact_dataframe
+        pieces = [cols.pop(col, None) for _, cols in chunks]
+        if any(piece is None for piece in pieces):
+            like = next(piece for piece in pieces if piece is not None)
+            pieces = [piece if piece is not None else _missing_piece(like, n) for piece, (n, _) in zip(pieces, chunks)]
+        out[col] = _concat_column(pieces)
+        del pieces
+    # copy=False keeps the joined columns as they are instead of consolidating them into new blocks
+    df = pd.DataFrame(out, copy=False)
+    mem_after = int(df.memory_usage(deep=True).sum())
+    meta = window_meta(df)
+    meta.update(mem_before=mem_before, mem_after=mem_after, mode="stream")
+    emit(f"{table}: streamed {len(df)} rows in {len(chunks)} chunks, {len(df.columns)} columns kept in memory")
+    return df, meta
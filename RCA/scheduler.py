@@ -0,0 +1,142 @@
+"""Scheduler for the headless auto-run: runs each window when it is due and backfills missed ones.
+
+    python -m pipeline schedule --config JSON_Files/app_config.json
+
+A window is due once its end (date_setup at 07:59:59) has passed. When runs were missed, all due
+windows are retrieved and analyzed in parallel on one shared engine (one connection pool); they
+are persisted, reported and committed in window order, and date_setup only moves past a window
+when it and every window before it succeeded, so a failed window is retried on the next pass.
+Windows are checkpointed like run_auto, so that retry resumes after the last stage it completed.
+"""
+import json
+import time as _time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, time
+from app_state import log
+from pipeline import (Canceled, connect, select_tables, auto_run_window, run_checkpointed, persist_run,
+                      write_run_report, set_date_setup, period_suffix)
+
+BACKFILL_WORKERS = 2
+POLL_SECONDS = 300
+
+def window_end(date_setup):
+    return datetime.combine(datetime.strptime(date_setup, "%Y/%m/%d").date(), time(7, 59, 59))
+
+def due_windows(config, now=None, limit=0):
+    """date_setup values (YYYY/MM/DD) of the windows that ended before now, oldest first."""
+    date_str = config.get("date_setup")
+    if not date_str:
+        return []
+    now = now or datetime.now()
+    every = timedelta(days=config.get("every", 7))
+    due = []
+    end = window_end(date_str)
+    while end <= now and (not limit or len(due) < limit):
+        due.append(end.strftime("%Y/%m/%d"))
+        end += every
+    return due
+
+def next_due(config):
+    """When the window of the current date_setup ends, None without a date_setup."""
+    date_str = config.get("date_setup")
+    return window_end(date_str) if date_str else None
+
+def _tagged(emit, date_setup):
+    # windows run side by side, so their log lines carry the window they belong to
+    return lambda msg: emit(f"[{date_setup}] {msg}")
+
+def backfill(config, rules, troubleshooting=None, config_path=None, workers=0, now=None, emit=log,
+             should_stop=None, report=True, output_dir=None):
+    """Run every due window. Returns (windows committed, windows failed).
+
+    At most `workers` windows are retrieved and analyzed at a time, each with its share of the
+    memory budget. Results are handled in window order, so date_setup (in config and, when
+    config_path is set, in the file) advances one window at a time.
+    """
+    from retrieval import memory_budget_bytes
+    due = due_windows(config, now, config.get("backfill_max_windows", 0))
+    if not due:
+        return 0, 0
+    workers = max(1, min(workers or config.get("backfill_workers", BACKFILL_WORKERS), len(due)))
+    emit(f"{len(due)} auto-run window(s) due ({due[0]} to {due[-1]}), running {workers} at a time")
+    engine = connect(config, emit)
+    stations = select_tables(engine, config, emit)
+    budget_mb = memory_budget_bytes(config.get("memory_budget_mb", 0)) // workers // (1024 * 1024)
+    every = timedelta(days=config.get("every", 7))
+
+    def submit(pool, date_setup):
+        window_config = dict(config, date_setup=date_setup)
+        # checkpointed per window: a backfill that stopped resumes its windows after their last stage
+        return pool.submit(run_checkpointed, engine, window_config, rules, auto_run_window(window_config),
+                           _tagged(emit, date_setup), should_stop, budget_mb, stations)
+
+    committed = failed = 0
+    contiguous = True
+    pending = deque()
+    remaining = deque(due)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while remaining and len(pending) < workers:
+                date_setup = remaining.popleft()
+                pending.append((date_setup, submit(pool, date_setup)))
+            while pending:
+                date_setup, future = pending.popleft()
+                tagged = _tagged(emit, date_setup)
+                suffix = period_suffix(date_setup, every.days)
+                try:
+                    run = future.result()
+                    persist_run(run, config, tagged)
+                    if report:
+                        write_run_report(run, config, troubleshooting, tagged, should_stop, output_dir, suffix)
+                    if run["checkpoint"] is not None:
+                        run["checkpoint"].clear()
+                    # the frames of a finished window are not kept while the next one is awaited
+                    run = None
+                except Canceled:
+                    raise
+                except Exception as e:
+                    emit(f"Auto-run window {date_setup} failed: {e}")
+                    failed += 1
+                    contiguous = False
+                else:
+                    if contiguous:
+                        config["date_setup"] = (window_end(date_setup) + every).strftime("%Y/%m/%d")
+                        if config_path:
+                            set_date_setup(config_path, config["date_setup"])
+                        committed += 1
+                        emit(f"Window {date_setup} done, updated config date to {config['date_setup']}")
+                    else:
+                        emit(f"Window {date_setup} done; config date stays at {config['date_setup']} "
+                             f"until the failed window succeeds")
+                if remaining:
+                    date_setup = remaining.popleft()
+                    pending.append((date_setup, submit(pool, date_setup)))
+        except Canceled:
+            for _, future in pending:
+                future.cancel()
+            raise
+    emit(f"Backfill finished: {committed} window(s) committed, {failed} failed")
+    return committed, failed
+
+def serve(config_path, rules, troubleshooting=None, workers=0, poll_s=POLL_SECONDS, once=False, emit=log,
+          should_stop=None, report=True, output_dir=None):
+    """Run due windows, then sleep until the next one ends (checking at least every poll_s seconds).
+
+    The configuration is re-read on every pass, so changes saved from the app apply to the next run.
+    """
+    while True:
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        try:
+            backfill(config, rules, troubleshooting, config_path, workers, emit=emit, should_stop=should_stop,
+                     report=report, output_dir=output_dir)
+        except Canceled:
+            raise
+        except Exception as e:
+            emit(f"Scheduled auto-run failed, retrying in {poll_s}s: {e}")
+        if once:
+            return
+        due = next_due(config)
+        wait = poll_s if due is None else min(poll_s, max((due - datetime.now()).total_seconds(), 1))
+        _time.sleep(wait)
@@ -0,0 +1,52 @@
+from collections import deque
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+# 10 Hz: fast enough for a progress bar, cheap for the GUI thread
+FLUSH_INTERVAL_MS = 100
+
+class Telemetry(QObject):
+    """Batches a worker's log lines and progress and forwards them to the GUI at a fixed rate.
+
+    Create it in the GUI thread with the worker's signals. The worker calls log() and progress()
+    from its own thread as often as it likes; that is only a deque append or an int store. A
+    GUI-thread timer emits the pending lines and the latest progress value every interval, so no
+    event is queued across threads per row and the number of updates depends on the run time,
+    not on the number of rows. close() flushes what is left ahead of any signal the worker emits
+    after it.
+    """
+    _close_requested = pyqtSignal()
+
+    def __init__(self, log_signal, progress_signal=None, interval_ms=FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.log_signal = log_signal
+        self.progress_signal = progress_signal
+        self._lines = deque()
+        self._progress = None
+        self._sent_progress = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        # queued when called from the worker thread, so it runs after the lines already sent
+        self._close_requested.connect(self._close)
+        self._timer.start()
+
+    def log(self, msg):
+        self._lines.append(msg)
+
+    def progress(self, value):
+        self._progress = value
+
+    def flush(self):
+        while self._lines:
+            self.log_signal.emit(self._lines.popleft())
+        value = self._progress
+        if self.progress_signal is not None and value is not None and value != self._sent_progress:
+            self._sent_progress = value
+            self.progress_signal.emit(value)
+
+    def close(self):
+        self._close_requested.emit()
+
+    def _close(self):
+        self._timer.stop()
+        self.flush()
@@ -0,0 +1,67 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from analysis_utils import analyze_row_with_path, collect_rule_features, encode_features, evaluate_rule
+from pipeline import station_rule, station_rules
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "JSON_Files", "rules.json")
+
+RULE = {"feature": "Model",
+        "A": {"feature": "T1",
+              "fail": {"Prediction": "NG", "root_cause": "T1 failed"},
+              "Disable": {"Prediction": "OK"},
+              "pass": {"feature": "T2", "X7": {"Prediction": "NG", "root_cause": "T2 X7"},
+                       "pass": {"Prediction": "OK"}, "fail": {"Prediction": "NG"}}},
+        "B": {"Prediction": "NG"}}
+
+
+def row_by_row(df, rule):
+    out = [analyze_row_with_path(row, rule) for _, row in df.iterrows()]
+    return [list(col) for col in zip(*out)] if out else [[], [], []]
+
+
+def vectorized(df, rule):
+    preds, causes, paths = evaluate_rule(encode_features(df, collect_rule_features(rule)), len(df), rule)
+    return [list(preds), list(causes), list(paths)]
+
+
+def test_evaluate_rule_matches_row_by_row_on_every_branch():
+    df = pd.DataFrame({"Model": ["A", "A", "A", "A", "A", "B", "C", None, "A"],
+                       "T1": ["PASS", "0", "Disable", "PASS", None, "PASS", "PASS", "PASS", "PASS"],
+                       "T2": ["PASS", "PASS", "PASS", "FAIL", "PASS", "PASS", "PASS", "PASS", " x7 "]})
+    expected = row_by_row(df, RULE)
+    assert vectorized(df, RULE) == expected
+    # exact keys, fail / Disable / pass-like branches, missing and unmatched values are all exercised
+    assert expected[0] == ["OK", "NG", "OK", "NG", "Missing", "NG", "Unknown", "Missing", "NG"]
+
+
+def test_evaluate_rule_matches_row_by_row_on_categorical_and_numeric_columns():
+    df = pd.DataFrame({"Model": pd.Categorical(["A", "A", "B", "A"]),
+                       "T1": pd.Categorical(["PASS", "FAIL", "PASS", "Disable"]),
+                       "T2": [1.0, np.nan, 2.0, 1.0]})
+    rule = {"feature": "Model", "A": {"feature": "T2", "1": {"Prediction": "OK"}, "fail": {"Prediction": "NG"}},
+            "B": {"feature": "T1", "PASS": {"Prediction": "OK"}}}
+    assert vectorized(df, rule) == row_by_row(df, rule)
+
+
+@pytest.mark.skipif(not os.path.exists(RULES_PATH), reason="rules.json not found")
+def test_evaluate_rule_matches_row_by_row_on_the_shipped_rules():
+    from benchmarks.synthetic_stations import station_frame
+    with open(RULES_PATH) as f:
+        rules = json.load(f)
+    for station in rules:
+        model = next(iter(rules[station]["models"]))
+        rule = station_rule(rules, station, model)
+        df = station_frame(rules[station], 2000, ng_rate=0.3)
+        assert vectorized(df, rule) == row_by_row(df, rule), station
+
+
+def test_station_rules_of_the_selected_model_only():
+    rules = {"S1": {"models": {"M1": {"rules": [{"Prediction": "OK"}, {"Prediction": "NG"}]},
+                               "M2": {"rules": {"Prediction": "OK"}},
+                               "M3": {}}}}
+    assert [(m, i) for m, i, _ in station_rules(rules, "S1", "M2")] == [("M2", 0), ("M1", 0), ("M1", 1)]
+    assert [(m, i) for m, i, _ in station_rules(rules, "S1", "M1", all_models=False)] == [("M1", 0), ("M1", 1)]
+    assert station_rules(rules, "S1", "M3", all_models=False) == []
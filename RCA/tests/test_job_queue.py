@@ -0,0 +1,66 @@
+import pytest
+from job_queue import JobQueue, split_window
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.sqlite"))
+    q.submit("b1", [("S1", "M1", "2025-05-01 08:00:00", "2025-05-08 07:59:59"),
+                    ("S2", "M1", "2025-05-01 08:00:00", "2025-05-08 07:59:59")],
+             "2025-05-01 08:00:00", "2025-05-08 07:59:59", "Auto", "Serial")
+    return q
+
+
+def test_split_window_is_contiguous():
+    assert split_window("2025-05-01 08:00:00", "2025-05-08 07:59:59") == [("2025-05-01 08:00:00", "2025-05-08 07:59:59")]
+    pieces = split_window("2025-05-01 08:00:00", "2025-05-08 07:59:59", days=3)
+    assert pieces == [("2025-05-01 08:00:00", "2025-05-04 07:59:59"),
+                      ("2025-05-04 08:00:00", "2025-05-07 07:59:59"),
+                      ("2025-05-07 08:00:00", "2025-05-08 07:59:59")]
+
+
+def test_resubmit_adds_only_new_jobs(queue):
+    queue.submit("b1", [("S1", "M1", "2025-05-01 08:00:00", "2025-05-08 07:59:59")],
+                 "2025-05-01 08:00:00", "2025-05-08 07:59:59")
+    assert queue.status("b1") == {"pending": 2}
+
+
+def test_claims_are_exclusive_and_in_order(queue):
+    a, b = queue.claim("w1"), queue.claim("w2")
+    assert (a["station"], a["attempts"], a["state"], a["serial_column"]) == ("S1", 1, "Auto", "Serial")
+    assert b["station"] == "S2"
+    assert queue.claim("w3") is None
+    assert queue.status("b1") == {"running": 2}
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job = queue.claim("w1", lease_s=-1)
+    again = queue.claim("w2")
+    assert again["id"] == job["id"] and again["attempts"] == 2
+    # the first worker lost the job: none of its updates count
+    assert not queue.renew(job["id"], "w1")
+    assert not queue.complete(job["id"], "w1", "x.parquet", 1)
+    assert queue.fail(job["id"], "w1", "boom", job["attempts"]) is None
+    assert queue.renew(again["id"], "w2")
+    assert queue.complete(again["id"], "w2", "b1/job.parquet", 5)
+    assert [j["status"] for j in queue.batch("b1")["jobs"]] == ["done", "pending"]
+
+
+def test_expired_lease_at_the_attempt_cap_fails_the_job(queue):
+    for attempt in (1, 2):
+        assert queue.claim("w1", lease_s=-1, max_attempts=2)["attempts"] == attempt
+    nxt = queue.claim("w1", max_attempts=2)
+    assert nxt["station"] == "S2"
+    s1 = queue.batch("b1")["jobs"][0]
+    assert s1["status"] == "failed" and "after 2 attempt(s), worker w1 stopped" in s1["error"]
+
+
+def test_fail_retries_until_max_attempts(queue):
+    job = queue.claim("w1")
+    assert queue.fail(job["id"], "w1", "boom", job["attempts"], max_attempts=2) == "pending"
+    job = queue.claim("w1")
+    assert job["attempts"] == 2
+    assert queue.fail(job["id"], "w1", "boom again", job["attempts"], max_attempts=2) == "failed"
+    s1 = queue.batch("b1")["jobs"][0]
+    assert (s1["status"], s1["error"]) == ("failed", "boom again")
+    assert queue.claim("w1")["station"] == "S2"
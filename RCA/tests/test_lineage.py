@@ -0,0 +1,60 @@
+import pandas as pd
+from data_utils import normalize_result
+from lineage import build_lineage_index, detect_serial_column
+
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=["Serial", "Date_Time", "Result"]).assign(
+        Date_Time=lambda df: pd.to_datetime(df["Date_Time"]))
+
+
+def index(dfs, serial_column=""):
+    return build_lineage_index(dfs, lambda station: normalize_result(dfs[station]), serial_column)
+
+
+def test_no_serial_column():
+    assert index({"S1": pd.DataFrame({"Result": ["OK"]})}) is None
+
+
+def test_detect_serial_column_prefers_configured():
+    dfs = {"S1": pd.DataFrame(columns=["Serial", "Barcode"])}
+    assert detect_serial_column(dfs) == "Serial"
+    assert detect_serial_column(dfs, "Barcode") == "Barcode"
+    assert detect_serial_column(dfs, "Missing") is None
+
+
+def test_units_and_kpis():
+    dfs = {
+        "S1": frame([["A", "2025-05-01 08:00", "OK"], ["B", "2025-05-01 09:00", "NG"],
+                     ["B", "2025-05-01 10:00", "OK"], ["C", "2025-05-01 11:00", "OK"]]),
+        "S2": frame([["A", "2025-05-01 12:00", "OK"], ["B", "2025-05-01 13:00", "OK"],
+                     ["C", "2025-05-01 14:00", "NG"], [None, "2025-05-01 15:00", "NG"], ["", "2025-05-01 16:00", "NG"]]),
+    }
+    lineage = index(dfs)
+    units = lineage.units
+    # rows without a serial are not units
+    assert sorted(units.index) == ["A", "B", "C"]
+    assert units.loc["B", "passes"] == 3
+    assert units.loc["B", "first_fail_station"] == "S1"
+    assert units.loc["C", "first_fail_station"] == "S2"
+    assert list(units["first_pass_ok"]) == [True, False, False]
+    kpis = lineage.kpis()
+    assert (kpis["units"], kpis["ok_units"], kpis["ng_units"]) == (3, 1, 2)
+    assert round(kpis["fpy"], 6) == round(100 / 3, 6)
+    # S1 first passes: A ok, B ng, C ok; S2: A ok, B ok, C ng
+    assert round(kpis["rty"], 6) == round(2 / 3 * 2 / 3 * 100, 6)
+
+
+def test_unit_history_in_time_order():
+    dfs = {"S2": frame([["A", "2025-05-01 12:00", "OK"]]), "S1": frame([["A", "2025-05-01 08:00", "NG"]])}
+    history = index(dfs).unit_history("A")
+    assert list(history["Station"]) == ["S1", "S2"]
+    assert list(history["Seq"]) == [0, 1]
+    assert index(dfs).unit_history("missing").empty
+
+
+def test_ng_units_by_first_appearance():
+    dfs = {"S1": frame([["A", "2025-05-01 08:00", "OK"], ["B", "2025-05-02 08:00", "NG"], ["C", "2025-05-02 09:00", "OK"]])}
+    total, ng = index(dfs).ng_units_by_time("D")
+    assert list(total) == [1, 2]
+    assert list(ng) == [0, 1]
@@ -0,0 +1,38 @@
+import pandas as pd
+from pipeline import auto_run_window, period_suffix, period_windows, split_periods
+
+
+def test_auto_run_window():
+    assert auto_run_window({"date_setup": "2025/05/08", "every": 7}) == ("2025-05-01 08:00:00", "2025-05-08 07:59:59")
+
+
+def test_period_windows_are_contiguous():
+    windows = period_windows("2025/05/22", every=7, periods=3)
+    assert [d for d, _ in windows] == ["2025/05/08", "2025/05/15", "2025/05/22"]
+    assert windows[0][1] == ("2025-05-01 08:00:00", "2025-05-08 07:59:59")
+    for (_, (_, end)), (_, (start, _)) in zip(windows, windows[1:]):
+        assert pd.Timestamp(start) - pd.Timestamp(end) == pd.Timedelta(seconds=1)
+
+
+def test_period_suffix():
+    assert period_suffix("2025/05/08", 7) == ""
+    assert period_suffix("2025/05/08", 1) == "_2025-05-08"
+
+
+def test_split_periods_assigns_rows_to_their_window():
+    windows = period_windows("2025/05/15", every=7, periods=2)
+    times = pd.to_datetime(["2025-05-01 08:00:00", "2025-05-08 07:59:59", "2025-05-08 08:00:00",
+                            "2025-05-15 07:59:59", None])
+    df = pd.DataFrame({"Date_Time": times, "Result": ["OK", "NG", "OK", "NG", "OK"]}, index=[10, 11, 12, 13, 14])
+    results = pd.DataFrame({"Prediction": ["OK", "NG", "OK", "NG", "OK"]}, index=df.index)
+    run = {"retrieved": {"S1": df, "S2": pd.DataFrame()}, "results": {"S1": results}, "window": None}
+    periods = list(split_periods(run, windows, every=7))
+    assert [d for d, _ in periods] == ["2025/05/08", "2025/05/15"]
+    first, second = periods[0][1], periods[1][1]
+    assert list(first["retrieved"]["S1"].index) == [10, 11]
+    assert list(second["retrieved"]["S1"].index) == [12, 13]
+    # results stay aligned with their rows, and the window of each part is its own
+    assert list(second["results"]["S1"]["Prediction"]) == ["OK", "NG"]
+    assert second["window"] == windows[1][1]
+    assert second["metas"]["S1"]["rows"] == 2
+    assert first["retrieved"]["S2"].empty
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from report_model import ReportModel, rate_frequency, report_week
+
+
+@pytest.mark.parametrize("start, end, freq", [
+    ("2025-05-01 08:00:00", "2025-05-02 07:59:59", "4H"),
+    ("2025-05-01 08:00:00", "2025-05-11 07:59:59", "D"),
+    # eleven calendar days, though the timestamps are 10 days 23:59:59 apart
+    ("2025-05-01 08:00:00", "2025-05-12 07:59:59", "W"),
+    ("2025-05-01 08:00:00", "2025-05-31 07:59:59", "W"),
+    ("2025-05-01 08:00:00", "2025-06-01 07:59:59", "M"),
+])
+def test_rate_frequency_counts_calendar_days(start, end, freq):
+    assert rate_frequency(pd.Timestamp(start), pd.Timestamp(end))[0] == freq
+
+
+def test_rate_frequency_unknown_window():
+    assert rate_frequency(None, None)[0] == "4H"
+
+
+def test_report_week():
+    assert report_week(pd.Timestamp("2025-05-05 08:00")) == 19
+
+
+def model(troubleshooting=None):
+    times = pd.date_range("2025-05-05 08:00", periods=6, freq="H")
+    retrieved = {
+        "S1": pd.DataFrame({"Date_Time": times, "Result": ["OK", "NG", "NG", "OK", "OK", "OK"]}),
+        "S2": pd.DataFrame({"Date_Time": times, "Result": ["OK", "OK", "NG", "OK", "ok", "??"]}),
+    }
+    results = {
+        "S1": pd.DataFrame({"Prediction": ["OK", "NG", "NG", "OK", "OK", "OK"],
+                            "Root_Cause": ["", "Voltage_Test", "LED_Test", "", "", ""]}),
+        "S2": pd.DataFrame({"Prediction": ["OK", "OK", "NG", "OK", "OK", "OK"],
+                            "Root_Cause": ["", "", "Voltage_Test", "", "", ""]}),
+    }
+    return ReportModel(["S1", "S2"], retrieved, results, troubleshooting)
+
+
+def test_station_counts_and_kpis_without_lineage():
+    m = model()
+    assert [(r["station"], r["ok"], r["ng"]) for r in m.station_counts] == [("S1", 4, 2), ("S2", 4, 1)]
+    # without serials the station with the most NG stands for the line
+    assert m.kpis["total_ng"] == 2 and m.kpis["total_units"] == 6
+    assert m.pie["label"] == "S1"
+    assert (m.start, m.end) == (pd.Timestamp("2025-05-05 08:00"), pd.Timestamp("2025-05-05 13:00"))
+    assert m.ng_rate["label"] == "S1" and sum(m.ng_rate["count"]) == 2
+
+
+def test_root_causes_and_troubleshooting():
+    m = model({"S1": {"Voltage_Test": ["Check the supply"]}})
+    assert m.root_causes["S1"] == {"causes": ["Voltage_Test", "LED_Test"], "counts": [1, 1]}
+    assert m.root_causes["S2"] == {"causes": ["Voltage_Test"], "counts": [1]}
+    first = m.troubleshooting_rows[0]
+    assert first[:4] == ["S1", "Voltage_Test", ["Check the supply"], 1]
+    assert len(m.troubleshooting_rows) == 3
@@ -0,0 +1,68 @@
+import os
+import pytest
+import pandas as pd
+from result_store import ResultStore, parquet_available, store_analysis_results
+
+pytestmark = pytest.mark.skipif(not parquet_available(), reason="pyarrow is not installed")
+
+
+def rows(times, serials=None, prediction="NG", cause="Voltage_Test", run_id="r1"):
+    n = len(times)
+    return pd.DataFrame({
+        "Station": "S1", "Serial": pd.array(serials or [f"SN{i}" for i in range(n)], dtype="string"),
+        "Date_Time": pd.to_datetime(times), "Model": "M", "State": "Auto", "Result": prediction,
+        "Prediction": prediction, "Root_Cause": cause, "Match_Path": "", "Run_ID": run_id,
+    })
+
+
+def days(store):
+    return sorted(os.path.basename(os.path.dirname(p)) for p in store._partitions())
+
+
+def test_write_partitions_by_day(tmp_path):
+    store = ResultStore(str(tmp_path))
+    assert store.write("S1", rows(["2025-05-01 10:00", "2025-05-02 10:00", "2025-05-02 11:00"]), "r1") == 3
+    assert days(store) == ["day=2025-05-01", "day=2025-05-02"]
+    assert len(store.query(since="2025-05-02")) == 2
+
+
+def test_rewrite_replaces_the_window(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.write("S1", rows(["2025-05-01 10:00", "2025-05-02 10:00", "2025-05-03 10:00"], ["A", "B", "C"]), "r1")
+    # the re-run has no rows on 05-02: its old rows and index entries go too
+    store.write("S1", rows(["2025-05-01 11:00", "2025-05-03 09:00"], ["D", "E"], cause="LED_Test", run_id="r2"), "r2")
+    df = store.query()
+    assert list(df["Serial"]) == ["A", "D", "E", "C"]
+    assert days(store) == ["day=2025-05-01", "day=2025-05-03"]
+    assert store.unit_history("B").empty
+    assert not os.path.exists(os.path.join(str(tmp_path), "station=S1", "day=2025-05-02", "part.parquet"))
+
+
+def test_rewrite_is_idempotent(tmp_path):
+    store = ResultStore(str(tmp_path))
+    batch = rows(["2025-05-01 10:00", "2025-05-01 11:00"])
+    store.write("S1", batch, "r1")
+    store.write("S1", batch, "r2")
+    assert len(store.query()) == 2
+
+
+def test_queries_by_serial_and_cause(tmp_path):
+    store = ResultStore(str(tmp_path))
+    store.write("S1", pd.concat([rows(["2025-05-01 10:00"], ["A"]),
+                                 rows(["2025-05-01 11:00"], ["B"], prediction="OK", cause="Good Condition")]), "r1")
+    assert list(store.unit_history("A")["Serial"]) == ["A"]
+    assert list(store.query(root_cause="Voltage_Test")["Serial"]) == ["A"]
+    assert store.root_causes() == ["Voltage_Test"]
+    assert list(store.ng_units(days=0)["Serial"]) == ["A"]
+    assert store.stations() == ["S1"]
+
+
+def test_store_analysis_results(tmp_path):
+    retrieved = {"S1": pd.DataFrame({"Serial": ["A", "B"], "Date_Time": pd.to_datetime(["2025-05-01 10:00", "2025-05-01 11:00"]),
+                                     "Result": ["NG", "OK"], "Model": "M", "State": "Auto"})}
+    results = {"S1": pd.DataFrame({"Prediction": ["NG", "OK"], "Root_Cause": ["Voltage_Test", "Good Condition"],
+                                   "Match_Path": ["", ""]})}
+    assert store_analysis_results(retrieved, results, str(tmp_path), emit=lambda msg: None) == 2
+    df = ResultStore(str(tmp_path)).query()
+    assert list(df["Serial"]) == ["A", "B"]
+    assert list(df["Prediction"]) == ["NG", "OK"]
@@ -0,0 +1,54 @@
+from datetime import datetime
+import pytest
+import scheduler
+
+
+def test_due_windows_oldest_first():
+    config = {"date_setup": "2025/05/05", "every": 7}
+    assert scheduler.due_windows(config, now=datetime(2025, 5, 19, 8, 0)) == ["2025/05/05", "2025/05/12", "2025/05/19"]
+    # a window is due once its end (07:59:59) has passed
+    assert scheduler.due_windows(config, now=datetime(2025, 5, 5, 7, 59, 58)) == []
+    assert scheduler.due_windows(config, now=datetime(2025, 5, 19, 8, 0), limit=2) == ["2025/05/05", "2025/05/12"]
+    assert scheduler.due_windows({}, now=datetime(2025, 5, 19)) == []
+
+
+def test_next_due():
+    assert scheduler.next_due({"date_setup": "2025/05/05"}) == datetime(2025, 5, 5, 7, 59, 59)
+    assert scheduler.next_due({}) is None
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    """backfill with the retrieval, analysis and report steps replaced; windows in `fail` raise."""
+    fail = set()
+    dates = []
+    monkeypatch.setattr(scheduler, "connect", lambda config, emit=None: None)
+    monkeypatch.setattr(scheduler, "select_tables", lambda engine, config, emit=None: ["S1"])
+
+    def run(engine, config, rules, window, emit, should_stop, budget_mb, stations):
+        if config["date_setup"] in fail:
+            raise RuntimeError("boom")
+        return {"checkpoint": None}
+    monkeypatch.setattr(scheduler, "run_checkpointed", run)
+    monkeypatch.setattr(scheduler, "persist_run", lambda run, config, emit=None: None)
+    monkeypatch.setattr(scheduler, "write_run_report", lambda *a, **k: None)
+    monkeypatch.setattr(scheduler, "set_date_setup", lambda path, date: dates.append(date))
+    return fail, dates
+
+
+def test_backfill_commits_windows_in_order(fake_pipeline):
+    _, dates = fake_pipeline
+    config = {"date_setup": "2025/05/05", "every": 1, "backfill_max_windows": 3}
+    assert scheduler.backfill(config, {}, config_path="cfg.json", now=datetime(2025, 6, 1), emit=lambda m: None) == (3, 0)
+    assert dates == ["2025/05/06", "2025/05/07", "2025/05/08"]
+    assert config["date_setup"] == "2025/05/08"
+
+
+def test_backfill_stops_at_a_failed_window(fake_pipeline):
+    fail, dates = fake_pipeline
+    fail.add("2025/05/06")
+    config = {"date_setup": "2025/05/05", "every": 1, "backfill_max_windows": 3}
+    assert scheduler.backfill(config, {}, config_path="cfg.json", now=datetime(2025, 6, 1), emit=lambda m: None) == (1, 1)
+    # the window after the failed one ran, but date_setup stays so the failed one is retried
+    assert dates == ["2025/05/06"]
+    assert config["date_setup"] == "2025/05/06"